@@ -3,29 +3,69 @@
 from flask import Flask, jsonify, Response
 import cv2
 import subprocess
-import json
+import sys
+import threading
 from pathlib import Path
 
+# El detector de rostros compartido vive en el proyecto FRT
+# (Dev/Carpeta Fabri B/Proyecto/FRT/detector.py)
+frt_root = Path(__file__).resolve().parents[1] / "Carpeta Fabri B" / "Proyecto"
+if str(frt_root) not in sys.path:
+    sys.path.insert(0, str(frt_root))
+from FRT.detector import get_detector
+from FRT.fuentes import open_source
+from FRT.reconocimiento import load_matcher, load_thresholds
+from FRT.versiones_modelo import ModelWatcher, current_version
+
 app = Flask(__name__)
 
-# Rutas de los modelos y etiquetas
-MODEL_PATH = Path("model_lbph.yml")
-LABELS_PATH = Path("labels.json")
 FACE_SIZE = (200, 200)
-THRESHOLD = 60.0
-
-# Cargar el modelo y las etiquetas
-def load_model():
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    recognizer.read(str(MODEL_PATH))
-    label_to_name = json.loads(LABELS_PATH.read_text(encoding="utf-8"))
-    return recognizer, label_to_name
-
-# Abrir la cámara
-cap = cv2.VideoCapture(0)
+VIDEO_SOURCE = "0"  # Índice de cámara, video, carpeta de imágenes o URL (rtsp://...)
+
+# El modelo (la versión vigente de FRT/model, en formato binario si lo tiene)
+# se carga una sola vez, con el primer pedido; las versiones nuevas las carga
+# el ModelWatcher en segundo plano y reemplazan a la anterior de una vez.
+# El umbral es el calibrado de esa versión (FRT/calibracion.py), el mismo que
+# usa el reconocedor, así la web y la consola deciden igual.
+_model = None
+_model_lock = threading.Lock()
+_watcher = None
+
+def _load(version):
+    matcher, label_to_person = load_matcher(version)
+    threshold, _ = load_thresholds(version)
+    return matcher, label_to_person, threshold
+
+def _reload_model(version):
+    global _model
+    _model = _load(version)
+    print(f"[Modelo] Versión {version} cargada")
+
+def get_model():
+    """(comparador, label -> persona, umbral) de la versión vigente del modelo."""
+    global _model, _watcher
+    with _model_lock:
+        if _model is None:
+            current = current_version()
+            version = current["version"] if current else None
+            _model = _load(version)
+            _watcher = ModelWatcher(_reload_model, version=version).start()
+        return _model
+
+# La fuente de video (la cámara por defecto) se abre con el primer pedido y se
+# comparte entre pedidos; así el servidor arranca aunque no haya cámara.
+_cap = None
+_cap_lock = threading.Lock()
+
+def get_source():
+    global _cap
+    with _cap_lock:
+        if _cap is None:
+            _cap = open_source(VIDEO_SOURCE)
+        return _cap
 
 # Función para generar el video en tiempo real
-def generate_frames():
+def generate_frames(cap):
     while True:
         success, frame = cap.read()  # Leemos un fotograma de la cámara
         if not success:
@@ -36,11 +76,12 @@ def generate_frames():
 
             if face is not None:  # Solo procesamos la cara si se detecta una
                 x, y, w, h = coords  # Desempaquetamos las coordenadas
-                recognizer, label_to_name = load_model()
+                matcher, label_to_person, threshold = get_model()
                 face_norm = cv2.equalizeHist(cv2.resize(face, FACE_SIZE))
-                label, conf = recognizer.predict(face_norm)
-                name = label_to_name.get(str(label), "Desconocido")
-                is_auth = conf < THRESHOLD
+                labels, dists = matcher.predict_batch(face_norm, k=1)
+                label, conf = int(labels[0, 0]), float(dists[0, 0])
+                name = label_to_person.get(label, "Desconocido")
+                is_auth = conf < threshold
 
                 # Emitir el estado de autorización
                 if is_auth:
@@ -62,15 +103,19 @@ def generate_frames():
 # Ruta para transmitir el video en vivo
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(), mimetype='multipart/x-mixed-replace; boundary=frame')
+    try:
+        cap = get_source()
+    except RuntimeError as e:
+        return Response(str(e), status=503)
+    return Response(generate_frames(cap), mimetype='multipart/x-mixed-replace; boundary=frame')
 
 # Función para detectar las caras en la imagen
 def detect_face(gray):
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-    faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-    if len(faces) == 0:
+    # El clasificador Haar se carga una sola vez por hilo (no en cada fotograma)
+    box = get_detector().detect_largest(gray)
+    if box is None:
         return None, None  # Si no se detectan caras, devolvemos None
-    x, y, w, h = max(faces, key=lambda r: r[2] * r[3])
+    x, y, w, h = box
     return gray[y:y+h, x:x+w], (x, y, w, h)  # Devolvemos la cara recortada y las coordenadas
 
 # Ruta para ejecutar el reconocimiento y determinar si la persona está autorizada
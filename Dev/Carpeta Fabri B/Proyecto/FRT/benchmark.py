@@ -0,0 +1,243 @@
+"""Benchmark offline del reconocimiento: latencia por etapa, FPS, memoria y precisión.
+
+Dos modos:
+
+- faces/ (por defecto): una de cada `--holdout-every` fotos de cada persona
+  es sonda y el resto galería. Cada sonda se rodea de un borde para simular
+  un fotograma, se detecta, se normaliza y se compara. Además de la latencia
+  reporta precisión top-1, FAR y FRR al umbral del modelo (el calibrado o
+  THRESHOLD). Para el FAR cada
+  sonda se compara también sin las muestras de su propia persona (un
+  impostor que no está enrolado).
+- `--source`: video, carpeta de imágenes o stream grabado sin etiquetas
+  (ver FRT/fuentes.py) contra el modelo entrenado; solo latencia y FPS.
+
+El resultado se escribe en JSON (`--out`) para comparar entre versiones:
+    python FRT/benchmark.py --out bench.json --tag v1.2
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+try:
+    import resource  # no existe en Windows
+except ImportError:
+    resource = None
+
+try:
+    from FRT.comparador_lbph import LBPHMatcher, holdout_mask, lbp_histograms
+    from FRT.detector import FaceDetector
+    from FRT.fuentes import open_source
+    from FRT.reconocimiento import DETECT_WIDTH, FACE_SIZE, load_matcher, load_thresholds
+    from FRT.entrenar_modelo import load_dataset
+except ImportError:
+    from comparador_lbph import LBPHMatcher, holdout_mask, lbp_histograms
+    from detector import FaceDetector
+    from fuentes import open_source
+    from reconocimiento import DETECT_WIDTH, FACE_SIZE, load_matcher, load_thresholds
+    from entrenar_modelo import load_dataset
+
+PAD = 0.5             # Borde alrededor de cada sonda de faces/ (fracción del lado)
+HOLDOUT_EVERY = 5     # Una de cada N fotos de cada persona es sonda
+STAGES = ("detect", "normalize", "predict")
+
+
+def latency_summary(times_ms: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 y media de una lista de latencias en ms."""
+    if not times_ms:
+        return {"n": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    arr = np.asarray(times_ms)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+    return {"n": int(arr.size), "mean_ms": float(arr.mean()),
+            "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99)}
+
+
+def peak_memory_mb() -> Dict[str, Optional[float]]:
+    """Pico de memoria: del proceso (ru_maxrss) y de las asignaciones de Python/NumPy."""
+    rss = None
+    if resource is not None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS informa bytes; Linux y los demás, KiB
+        rss = maxrss / (1024.0 * 1024.0) if sys.platform == "darwin" else maxrss / 1024.0
+    traced = tracemalloc.get_traced_memory()[1] / (1024.0 * 1024.0) if tracemalloc.is_tracing() else None
+    return {"process_rss": rss, "python_traced": traced}
+
+
+def _time_frame(gray, detector: FaceDetector, matcher: LBPHMatcher, times: Dict[str, list],
+                fallback_box=None):
+    """Detecta, normaliza y compara la cara más grande de `gray` midiendo cada etapa.
+
+    Devuelve (detectada, label, distancia); sin cara y sin `fallback_box`, (False, None, None).
+    """
+    t0 = time.perf_counter()
+    box = detector.detect_largest(gray)
+    t1 = time.perf_counter()
+    times["detect"].append((t1 - t0) * 1000.0)
+    detected = box is not None
+    if box is None:
+        if fallback_box is None:
+            return False, None, None
+        box = fallback_box
+
+    x, y, w, h = box
+    t1 = time.perf_counter()
+    face = cv2.equalizeHist(cv2.resize(gray[y:y+h, x:x+w], FACE_SIZE))
+    t2 = time.perf_counter()
+    label, dist = matcher.predict(face)
+    t3 = time.perf_counter()
+    times["normalize"].append((t2 - t1) * 1000.0)
+    times["predict"].append((t3 - t2) * 1000.0)
+    return detected, label, dist
+
+
+def benchmark_faces(faces, person_ids, threshold: float, holdout_every: int = HOLDOUT_EVERY,
+                    detect_width: Optional[int] = DETECT_WIDTH) -> dict:
+    """Latencia y precisión sobre faces/ con un split fijo galería/sonda."""
+    labels = np.asarray(person_ids).astype(np.int64)
+    is_probe = holdout_mask(labels, holdout_every)
+    gallery_idx, probe_idx = np.flatnonzero(~is_probe), np.flatnonzero(is_probe)
+    if len(probe_idx) == 0 or len(gallery_idx) == 0:
+        raise ValueError("Hacen falta al menos dos fotos por persona para separar galería y sondas.")
+
+    gallery = np.vstack([lbp_histograms(faces[gallery_idx[i:i + 256]])
+                         for i in range(0, len(gallery_idx), 256)])
+    matcher = LBPHMatcher(gallery, labels[gallery_idx])
+    detector = FaceDetector(detect_width=detect_width)
+
+    times: Dict[str, list] = {s: [] for s in STAGES}
+    probes, preds, dists, detected = [], [], [], 0
+    t_start = time.perf_counter()
+    for i in probe_idx:
+        crop = np.asarray(faces[i])
+        pad = int(crop.shape[0] * PAD)
+        gray = cv2.copyMakeBorder(crop, pad, pad, pad, pad, cv2.BORDER_REPLICATE)
+        # Si el detector no encuentra la cara se usa la caja conocida, así
+        # la precisión mide al reconocedor y no al detector
+        hit, label, dist = _time_frame(gray, detector, matcher, times,
+                                       fallback_box=(pad, pad, crop.shape[1], crop.shape[0]))
+        detected += int(hit)
+        preds.append(label)
+        dists.append(dist)
+        probes.append(crop)
+    elapsed = time.perf_counter() - t_start
+
+    truth = labels[probe_idx]
+    preds, dists = np.asarray(preds), np.asarray(dists)
+    genuine_ok = (preds == truth) & (dists < threshold)
+
+    # Impostores: la mejor distancia contra las demás personas (la propia queda fuera)
+    per_person = matcher.person_distances(matcher.features(np.stack(probes)))
+    per_person[truth[:, None] == matcher.people[None, :]] = np.inf
+    impostor = per_person.min(axis=1) if len(matcher.people) > 1 else np.full(len(truth), np.inf)
+
+    return {
+        "mode": "faces",
+        "people": int(len(matcher.people)),
+        "gallery": int(len(gallery_idx)),
+        "probes": int(len(probe_idx)),
+        "detected": detected,
+        "stages": {s: latency_summary(times[s]) for s in STAGES},
+        "fps": len(probe_idx) / elapsed if elapsed > 0 else 0.0,
+        "accuracy": {
+            "threshold": threshold,
+            "top1": float(np.mean(preds == truth)),
+            "frr": float(1.0 - np.mean(genuine_ok)),
+            "far": float(np.mean(impostor < threshold)) if len(matcher.people) > 1 else None,
+        },
+    }
+
+
+def benchmark_source(source, max_frames: Optional[int] = None,
+                     detect_width: Optional[int] = DETECT_WIDTH) -> dict:
+    """Latencia y FPS sobre una grabación sin etiquetas con el modelo entrenado."""
+    matcher, _ = load_matcher(shortlist=None)
+    detector = FaceDetector(detect_width=detect_width)
+
+    times: Dict[str, list] = {s: [] for s in STAGES}
+    frames, with_face = 0, 0
+    t_start = time.perf_counter()
+    with open_source(source) as src:
+        for frame in src:
+            if max_frames is not None and frames >= max_frames:
+                break
+            gray = cv2.cvtColor(frame.image, cv2.COLOR_BGR2GRAY)
+            hit, _, _ = _time_frame(gray, detector, matcher, times)
+            frames += 1
+            with_face += int(hit)
+    elapsed = time.perf_counter() - t_start
+    return {
+        "mode": "source",
+        "source": str(source),
+        "frames": frames,
+        "detected": with_face,
+        "stages": {s: latency_summary(times[s]) for s in STAGES},
+        "fps": frames / elapsed if elapsed > 0 else 0.0,
+        "accuracy": None,
+    }
+
+
+def run_benchmark(source=None, holdout_every: int = HOLDOUT_EVERY, max_frames: Optional[int] = None,
+                  threshold: Optional[float] = None, detect_width: Optional[int] = DETECT_WIDTH,
+                  tag: Optional[str] = None) -> dict:
+    """Corre el benchmark (faces/ si `source` es None) y devuelve el reporte completo."""
+    if threshold is None:
+        threshold = load_thresholds()[0]
+    tracemalloc.start()
+    try:
+        if source is None:
+            faces, person_ids, _ = load_dataset()
+            if len(faces) == 0:
+                raise ValueError("No hay caras en faces/.")
+            report = benchmark_faces(faces, person_ids, threshold, holdout_every, detect_width)
+        else:
+            report = benchmark_source(source, max_frames, detect_width)
+        report["peak_memory_mb"] = peak_memory_mb()
+    finally:
+        tracemalloc.stop()
+    report["config"] = {"detect_width": detect_width, "face_size": list(FACE_SIZE),
+                        "threshold": threshold, "holdout_every": holdout_every}
+    report["tag"] = tag
+    report["date"] = datetime.now().isoformat(timespec="seconds")
+    report["opencv"] = cv2.__version__
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark offline de detección + normalización + LBPH")
+    parser.add_argument("--source", default=None,
+                        help="video, carpeta de imágenes o URL grabada (por defecto: faces/ con sondas)")
+    parser.add_argument("--holdout-every", type=int, default=HOLDOUT_EVERY,
+                        help="una de cada N fotos de cada persona se usa como sonda")
+    parser.add_argument("--frames", type=int, default=None, help="máximo de fotogramas de --source")
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="umbral de distancia (por defecto el del modelo)")
+    parser.add_argument("--detect-width", type=int, default=DETECT_WIDTH,
+                        help="ancho de detección (0 = resolución completa)")
+    parser.add_argument("--tag", default=None, help="etiqueta de versión guardada en el JSON")
+    parser.add_argument("--out", default="benchmark.json", help="archivo JSON de salida")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.source, args.holdout_every, args.frames, args.threshold,
+                           args.detect_width or None, args.tag)
+    with open(args.out, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, ensure_ascii=False, indent=2)
+
+    for stage, st in report["stages"].items():
+        print(f"{stage:>10}: p50 {st['p50_ms']:.2f} ms  p95 {st['p95_ms']:.2f} ms  p99 {st['p99_ms']:.2f} ms")
+    print(f"{'fps':>10}: {report['fps']:.1f}")
+    mem = report["peak_memory_mb"]
+    if mem["process_rss"] is not None:
+        print(f"{'memoria':>10}: {mem['process_rss']:.0f} MB pico del proceso")
+    acc = report["accuracy"]
+    if acc is not None:
+        far = "n/d" if acc["far"] is None else f"{acc['far']:.3f}"
+        print(f"{'precisión':>10}: top-1 {acc['top1']:.3f}  FAR {far}  FRR {acc['frr']:.3f}"
+              f"  (umbral {acc['threshold']})")
+    print(f"[OK] Resultados en {args.out}")
@@ -0,0 +1,182 @@
+"""Calibración del umbral de distancia a partir de las caras enroladas.
+
+Con el mismo split fijo que el benchmark (una de cada `--holdout-every` fotos
+de cada persona es sonda), cada sonda da:
+
+- un puntaje genuino: la distancia a la muestra más cercana de su persona;
+- un puntaje impostor: la distancia a la persona más cercana que no es ella
+  (como alguien que no está enrolado y se parece a otro).
+
+Todas las distancias salen de una sola matriz sonda x galería (ver
+comparador_lbph.py). Con eso se barre el umbral y se escribe la curva ROC/DET
+(FAR y FRR por umbral) en CSV. El umbral recomendado para el FAR objetivo y
+uno más estricto para decidir con el primer fotograma se guardan en los
+metadatos de una versión nueva del modelo (ver FRT/versiones_modelo.py), de
+donde los lee reconocimiento.py; un reconocedor en marcha la carga solo.
+
+    python FRT/calibracion.py --target-far 0.01 --csv roc.csv
+"""
+import argparse
+import csv
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+try:
+    from FRT.comparador_lbph import LBPHMatcher, holdout_mask, lbp_histograms
+    from FRT.reconocimiento import load_thresholds
+    from FRT.entrenar_modelo import load_dataset
+    from FRT.versiones_modelo import (LABELS_FILE, META_FILE, MODEL_BIN_FILE, MODEL_FILE,
+                                      TRAIN_MANIFEST_FILE, model_files, publish_version)
+except ImportError:
+    from comparador_lbph import LBPHMatcher, holdout_mask, lbp_histograms
+    from reconocimiento import load_thresholds
+    from entrenar_modelo import load_dataset
+    from versiones_modelo import (LABELS_FILE, META_FILE, MODEL_BIN_FILE, MODEL_FILE,
+                                  TRAIN_MANIFEST_FILE, model_files, publish_version)
+
+TARGET_FAR = 0.01      # FAR objetivo para el umbral recomendado
+EARLY_FAR_FACTOR = 0.1 # El umbral de decisión inmediata apunta a TARGET_FAR * este factor
+HOLDOUT_EVERY = 5      # Una de cada N fotos de cada persona es sonda
+
+
+def score_pairs(faces, person_ids, holdout_every: int = HOLDOUT_EVERY) -> Tuple[np.ndarray, np.ndarray]:
+    """Puntajes (genuinos, impostores) de las sondas contra la galería."""
+    labels = np.asarray(person_ids).astype(np.int64)
+    is_probe = holdout_mask(labels, holdout_every)
+    if not is_probe.any() or is_probe.all():
+        raise ValueError("Hacen falta al menos dos fotos por persona para separar galería y sondas.")
+
+    hists = np.vstack([lbp_histograms(faces[i:i + 256]) for i in range(0, len(faces), 256)])
+    matcher = LBPHMatcher(hists[~is_probe], labels[~is_probe])
+    per_person = matcher.person_distances(hists[is_probe])
+
+    own = labels[is_probe][:, None] == matcher.people[None, :]
+    has_own = own.any(axis=1)
+    genuine = per_person[own]  # una por sonda con galería propia
+    others = np.where(own, np.inf, per_person)
+    impostor = others.min(axis=1) if len(matcher.people) > 1 else np.empty(0, np.float32)
+    if not has_own.all():
+        print(f"[Aviso] {int((~has_own).sum())} sondas sin muestras propias en la galería")
+    return genuine.astype(np.float64), impostor.astype(np.float64)
+
+
+def roc_curve(genuine: np.ndarray, impostor: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """FAR y FRR para cada umbral candidato (se acepta si distancia < umbral).
+
+    Returns:
+        (thresholds, far, frr), ordenados por umbral creciente
+    """
+    thresholds = np.unique(np.concatenate([genuine, impostor, [0.0]]))
+    thresholds = np.append(thresholds, np.nextafter(thresholds[-1], np.inf))
+    genuine, impostor = np.sort(genuine), np.sort(impostor)
+    # searchsorted(..., "left") = cantidad de puntajes estrictamente menores al umbral
+    accepted_gen = np.searchsorted(genuine, thresholds, side="left")
+    accepted_imp = np.searchsorted(impostor, thresholds, side="left")
+    far = accepted_imp / max(1, len(impostor))
+    frr = 1.0 - accepted_gen / max(1, len(genuine))
+    return thresholds, far, frr
+
+
+def threshold_for_far(impostor: np.ndarray, target_far: float) -> Optional[float]:
+    """El mayor umbral cuyo FAR sobre `impostor` no supera `target_far` (None sin impostores)."""
+    if len(impostor) == 0:
+        return None
+    ordered = np.sort(impostor)
+    allowed = int(np.floor(target_far * len(ordered)))
+    # Con distancia < ordered[allowed] se aceptan exactamente `allowed` impostores (sin empates)
+    return float(ordered[min(allowed, len(ordered) - 1)])
+
+
+def write_curve_csv(path, thresholds, far, frr) -> None:
+    """Curva ROC/DET: una fila por umbral con FAR, FRR y TAR (= 1 - FRR)."""
+    with open(path, 'w', newline='', encoding='utf-8') as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["threshold", "far", "frr", "tar"])
+        for t, a, r in zip(thresholds, far, frr):
+            writer.writerow([f"{t:.4f}", f"{a:.6f}", f"{r:.6f}", f"{1.0 - r:.6f}"])
+
+
+def save_thresholds(meta_update: dict) -> None:
+    """Publica una versión nueva del modelo con `meta_update` agregado a sus metadatos.
+
+    El modelo, los labels y el manifiesto se heredan sin cambios de la versión vigente.
+    """
+    files = model_files()
+    if not Path(files[MODEL_FILE]).exists():
+        raise ValueError("No hay modelo entrenado: entrená antes de calibrar.")
+    meta = {}
+    meta_path = Path(files[META_FILE])
+    if meta_path.exists():
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta.update(meta_update)
+    with publish_version(inherit=[MODEL_FILE, MODEL_BIN_FILE, LABELS_FILE, TRAIN_MANIFEST_FILE]) as vdir:
+        with open(os.path.join(vdir, META_FILE), 'w', encoding='utf-8') as fh:
+            json.dump(meta, fh, ensure_ascii=False, indent=2)
+
+
+def calibrate(target_far: float = TARGET_FAR, holdout_every: int = HOLDOUT_EVERY,
+              csv_path: Optional[str] = None, save: bool = True) -> dict:
+    """Calcula la curva, recomienda umbrales y (con `save`) los guarda en el modelo."""
+    faces, person_ids, _ = load_dataset()
+    if len(faces) == 0:
+        raise ValueError("No hay caras en faces/.")
+    genuine, impostor = score_pairs(faces, person_ids, holdout_every)
+    if len(impostor) == 0:
+        raise ValueError("Hacen falta al menos dos personas enroladas para medir impostores.")
+
+    thresholds, far, frr = roc_curve(genuine, impostor)
+    if csv_path:
+        write_curve_csv(csv_path, thresholds, far, frr)
+
+    threshold = threshold_for_far(impostor, target_far)
+    # El umbral de decisión inmediata solo se fija si hay impostores suficientes
+    # para estimar un FAR tan bajo; si no, se sigue votando siempre
+    early_far = target_far * EARLY_FAR_FACTOR
+    early = threshold_for_far(impostor, early_far) if early_far * len(impostor) >= 1 else None
+    result = {
+        "threshold": threshold,
+        "early_threshold": early,
+        "calibration": {
+            "target_far": target_far,
+            "far": float(np.mean(impostor < threshold)),
+            "frr": float(np.mean(genuine >= threshold)),
+            "genuine": int(len(genuine)),
+            "impostor": int(len(impostor)),
+            "holdout_every": holdout_every,
+            "date": datetime.now().isoformat(timespec="seconds"),
+        },
+    }
+    if save:
+        save_thresholds(result)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrar el umbral de distancia con las caras de faces/")
+    parser.add_argument("--target-far", type=float, default=TARGET_FAR,
+                        help="tasa de falsa aceptación objetivo (por defecto 0.01)")
+    parser.add_argument("--holdout-every", type=int, default=HOLDOUT_EVERY,
+                        help="una de cada N fotos de cada persona se usa como sonda")
+    parser.add_argument("--csv", default="roc.csv", help="archivo CSV de la curva ROC/DET")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="no guardar el umbral en los metadatos del modelo")
+    args = parser.parse_args()
+
+    current = load_thresholds()[0]
+    res = calibrate(args.target_far, args.holdout_every, args.csv, save=not args.dry_run)
+    cal = res["calibration"]
+    print(f"{cal['genuine']} puntajes genuinos, {cal['impostor']} impostores")
+    print(f"Umbral actual {current:.2f}; recomendado {res['threshold']:.2f} "
+          f"(FAR {cal['far']:.3f}, FRR {cal['frr']:.3f} para FAR objetivo {cal['target_far']})")
+    if res["early_threshold"] is not None:
+        print(f"Umbral de decisión inmediata: {res['early_threshold']:.2f}")
+    else:
+        print("Pocos impostores para un umbral de decisión inmediata: se decide siempre por votación")
+    print(f"[OK] Curva en {args.csv}")
+    if not args.dry_run:
+        print(f"[OK] Umbral guardado en {model_files()[META_FILE]}")
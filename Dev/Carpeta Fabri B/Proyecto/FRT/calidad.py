@@ -0,0 +1,143 @@
+"""Control de calidad de las muestras de enrolamiento.
+
+Antes de guardar una cara se mide:
+
+- tamaño y posición: la caja tiene que ser grande y no tocar el borde del
+  fotograma (una cara cortada o lejana aporta poco);
+- brillo: media de la cara sin ecualizar, ni muy oscura ni quemada;
+- nitidez: varianza del Laplaciano de la cara normalizada (baja = movida o
+  desenfocada);
+- pose: el detector frontal ya descarta perfiles; además se buscan los ojos
+  con el clasificador Haar de ojos y, si aparecen los dos, se rechaza la cara
+  girada (punto medio de los ojos corrido del centro) o inclinada. Si no se
+  encuentran (anteojos con reflejo, poca luz) no se rechaza: es una
+  aproximación barata, no una estimación de pose;
+- duplicados: distancia chi-cuadrado entre histogramas LBP de miniaturas de
+  64x64 contra las muestras ya guardadas; si es muy chica la cara no suma
+  información al modelo.
+"""
+import threading
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    from FRT.comparador_lbph import chi_square, lbp_histograms
+except ImportError:
+    from comparador_lbph import chi_square, lbp_histograms
+
+MIN_FACE_SIZE = 100        # Lado mínimo (px) de la caja en el fotograma completo
+EDGE_MARGIN = 4            # Distancia mínima (px) de la caja al borde del fotograma
+MIN_BRIGHTNESS = 40        # Media mínima de la cara sin ecualizar (0-255)
+MAX_BRIGHTNESS = 215       # Media máxima de la cara sin ecualizar
+MIN_SHARPNESS = 80.0       # Varianza mínima del Laplaciano de la cara normalizada
+EYE_CASCADE_PATH = cv2.data.haarcascades + "haarcascade_eye.xml"
+EYE_FACE_SIZE = 100        # Lado (px) de la cara reducida donde se buscan los ojos
+MAX_EYE_OFFSET = 0.12      # Corrimiento máximo del punto medio de los ojos (fracción del ancho)
+MAX_EYE_TILT = 0.27        # Inclinación máxima entre los ojos (dy/dx, ~15 grados)
+DUPLICATE_DISTANCE = 8.0   # Distancia LBP por debajo de la cual una cara es casi idéntica
+THUMB_SIZE = (64, 64)      # Miniatura usada para comparar duplicados
+THUMB_GRID = 4             # Celdas por lado del histograma LBP de la miniatura
+
+
+class Quality(NamedTuple):
+    ok: bool
+    reason: Optional[str]   # motivo del rechazo ("tamaño", "borde", "brillo", "nitidez", "pose")
+    sharpness: float
+    brightness: float
+    eye_offset: Optional[float] = None  # corrimiento de los ojos (None si no se encontraron)
+
+
+_local = threading.local()
+
+
+def _eye_cascade() -> cv2.CascadeClassifier:
+    # Un clasificador por hilo, como el detector de caras (FRT/detector.py)
+    cascade = getattr(_local, "eyes", None)
+    if cascade is None:
+        cascade = _local.eyes = cv2.CascadeClassifier(EYE_CASCADE_PATH)
+    return cascade
+
+
+def eye_pose(face_norm) -> Optional[Tuple[float, float]]:
+    """(corrimiento horizontal, inclinación) de los ojos en la cara, o None si no se ven los dos."""
+    size = EYE_FACE_SIZE
+    face = cv2.resize(face_norm, (size, size), interpolation=cv2.INTER_AREA)
+    top = size // 8
+    eyes = _eye_cascade().detectMultiScale(face[top:size * 6 // 10], 1.1, 3,
+                                           minSize=(size // 8, size // 8))
+    centers = [(x + w / 2.0, y + h / 2.0) for x, y, w, h in eyes]
+    left = [c for c in centers if c[0] < size / 2.0]
+    right = [c for c in centers if c[0] >= size / 2.0]
+    if not left or not right:
+        return None
+    (lx, ly), (rx, ry) = max(left), min(right)
+    offset = ((lx + rx) / 2.0 - size / 2.0) / size
+    tilt = abs(ry - ly) / max(1.0, rx - lx)
+    return offset, tilt
+
+
+def assess_face(gray, box: Tuple[int, int, int, int], face_norm) -> Quality:
+    """Evalúa la cara `box` de `gray` (fotograma completo) ya normalizada en `face_norm`."""
+    x, y, w, h = box
+    face = gray[y:y+h, x:x+w]
+    brightness = float(face.mean())
+    sharpness = float(cv2.Laplacian(face_norm, cv2.CV_64F).var())
+
+    reason = None
+    if min(w, h) < MIN_FACE_SIZE:
+        reason = "tamaño"
+    elif (x < EDGE_MARGIN or y < EDGE_MARGIN or x + w > gray.shape[1] - EDGE_MARGIN
+          or y + h > gray.shape[0] - EDGE_MARGIN):
+        reason = "borde"
+    elif not MIN_BRIGHTNESS <= brightness <= MAX_BRIGHTNESS:
+        reason = "brillo"
+    elif sharpness < MIN_SHARPNESS:
+        reason = "nitidez"
+
+    eye_offset = None
+    if reason is None:  # los ojos solo se buscan en caras que ya pasaron lo demás
+        pose = eye_pose(face_norm)
+        if pose is not None:
+            eye_offset = pose[0]
+            if abs(pose[0]) > MAX_EYE_OFFSET or pose[1] > MAX_EYE_TILT:
+                reason = "pose"
+    return Quality(reason is None, reason, sharpness, brightness, eye_offset)
+
+
+def _thumb_histogram(face_norm) -> np.ndarray:
+    thumb = cv2.resize(face_norm, THUMB_SIZE, interpolation=cv2.INTER_AREA)
+    return lbp_histograms(thumb[None], grid_x=THUMB_GRID, grid_y=THUMB_GRID)
+
+
+class DuplicateFilter:
+    """Histogramas de las muestras guardadas para descartar casi-duplicados."""
+
+    def __init__(self, max_distance: float = DUPLICATE_DISTANCE):
+        self.max_distance = max_distance
+        self.histograms = np.empty((0, 0), np.float32)
+
+    def load_dir(self, person_dir: Path) -> int:
+        """Agrega las muestras PNG que ya existan en `person_dir` (re-enrolamiento)."""
+        count = 0
+        for f in sorted(Path(person_dir).glob("*.png")):
+            img = cv2.imread(str(f), cv2.IMREAD_GRAYSCALE)
+            if img is not None:
+                self.add(img)
+                count += 1
+        return count
+
+    def distance(self, face_norm) -> float:
+        """Distancia a la muestra guardada más parecida (inf si no hay ninguna)."""
+        if len(self.histograms) == 0:
+            return float("inf")
+        return float(chi_square(_thumb_histogram(face_norm), self.histograms).min())
+
+    def is_duplicate(self, face_norm) -> bool:
+        return self.distance(face_norm) < self.max_distance
+
+    def add(self, face_norm) -> None:
+        hist = _thumb_histogram(face_norm)
+        self.histograms = hist if len(self.histograms) == 0 else np.vstack([self.histograms, hist])
@@ -0,0 +1,369 @@
+"""Comparador LBPH vectorizado con NumPy.
+
+`LBPHFaceRecognizer.predict` de OpenCV compara la sonda contra cada
+histograma guardado en un bucle escalar y devuelve solo el más cercano. Acá
+los histogramas del modelo entrenado se pasan a una única matriz float32
+`(n_muestras, n_bins)` (guardada traspuesta, por filas de bin) y las
+distancias chi-cuadrado contra un lote de caras se calculan de una vez,
+devolviendo los k labels más cercanos.
+
+El cálculo de LBP y del histograma espacial reproduce el de OpenCV
+(`elbp` + `spatial_histogram` en lbph_faces.cpp), así que las distancias son
+las mismas que da `recognizer.predict` y el THRESHOLD sigue valiendo.
+
+`LBPHMatcher.save`/`load` guardan el modelo en un formato binario propio
+(cabecera + matrices float32 crudas) que se abre con un único memory map, en
+vez de parsear el YAML de OpenCV.
+
+Medir pérdida de precisión vs aceleración del preselector por prototipos
+sobre las caras de faces/ (una de cada 5 fotos de cada persona es sonda):
+    python FRT/comparador_lbph.py --shortlist 1 2 3 5
+"""
+import json
+import math
+import struct
+import time
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+CHUNK_BYTES = 64 * 1024 * 1024  # Memoria máxima del bloque temporal de distancias
+
+# Formato binario: MAGIC, versión y largo de la cabecera (uint32 little-endian),
+# cabecera JSON y después cada arreglo alineado a BIN_ALIGN bytes
+BIN_MAGIC = b"LBPHBIN\0"
+BIN_VERSION = 1
+BIN_ALIGN = 64
+_BIN_PREFIX = struct.Struct("<8sII")
+
+
+def lbp_histograms(faces, radius: int = 1, neighbors: int = 8,
+                   grid_x: int = 8, grid_y: int = 8) -> np.ndarray:
+    """Histogramas LBP espaciales de un lote de caras (m, H, W) uint8 -> (m, n_bins) float32."""
+    src = np.asarray(faces)
+    if src.ndim == 2:
+        src = src[None]
+    m, rows, cols = src.shape
+    r = radius
+    center = src[:, r:rows - r, r:cols - r].astype(np.float32)
+    codes = np.zeros(center.shape, dtype=np.int64)
+    srcf = src.astype(np.float32)
+    eps = np.finfo(np.float32).eps
+
+    def shifted(dy, dx):
+        return srcf[:, r + dy:rows - r + dy, r + dx:cols - r + dx]
+
+    for n in range(neighbors):
+        # Puntos de muestreo e interpolación bilineal, igual que elbp_ de OpenCV
+        # (el ángulo en double y recién después a float32)
+        x = np.float32(radius * math.cos(2.0 * math.pi * n / neighbors))
+        y = np.float32(-radius * math.sin(2.0 * math.pi * n / neighbors))
+        fx, fy = int(np.floor(x)), int(np.floor(y))
+        cx, cy = int(np.ceil(x)), int(np.ceil(y))
+        ty, tx = np.float32(y - fy), np.float32(x - fx)
+        w1 = np.float32((1 - tx) * (1 - ty))
+        w2 = np.float32(tx * (1 - ty))
+        w3 = np.float32((1 - tx) * ty)
+        w4 = np.float32(tx * ty)
+        t = w1 * shifted(fy, fx) + w2 * shifted(fy, cx) + w3 * shifted(cy, fx) + w4 * shifted(cy, cx)
+        codes += (((t > center) | (np.abs(t - center) < eps)).astype(np.int64) << n)
+
+    n_patterns = 2 ** neighbors
+    lbp_rows, lbp_cols = codes.shape[1:]
+    height, width = lbp_rows // grid_y, lbp_cols // grid_x
+    cells = codes[:, :height * grid_y, :width * grid_x]
+    cells = cells.reshape(m, grid_y, height, grid_x, width).transpose(0, 1, 3, 2, 4)
+    cells = cells.reshape(m, grid_y * grid_x, height * width)
+
+    # Un bincount para todo el lote: cada celda de cada cara tiene su propio rango de bins
+    n_cells = grid_y * grid_x
+    offsets = (np.arange(m * n_cells, dtype=np.int64) * n_patterns).reshape(m, n_cells, 1)
+    counts = np.bincount((cells + offsets).ravel(), minlength=m * n_cells * n_patterns)
+    hist = counts.reshape(m, n_cells * n_patterns).astype(np.float32)
+    hist /= np.float32(height * width)
+    return hist
+
+
+def chi_square_binmajor(probes: np.ndarray, gallery_t: np.ndarray,
+                        gallery_sums: np.ndarray, columns=None) -> np.ndarray:
+    """Distancias chi-cuadrado (HISTCMP_CHISQR_ALT) de cada sonda contra la galería -> (m, n).
+
+    `gallery_t` es la galería traspuesta (n_bins, n_muestras) y `gallery_sums`
+    la suma de cada muestra. Con `columns` solo se compara contra esas
+    muestras (y la salida tiene len(columns) columnas). Se usa la identidad
+    2 * sum((a-b)^2 / (a+b)) = 2 * (sum(a) + sum(b)) - 8 * sum(a*b / (a+b)),
+    donde el último término solo es distinto de cero en los bins no nulos de la
+    sonda: con la galería por filas de bin esos bins se leen contiguos.
+    """
+    probes = np.asarray(probes, dtype=np.float32)
+    n = gallery_t.shape[1] if columns is None else len(columns)
+    out = np.empty((len(probes), n), dtype=np.float32)
+    for i, a in enumerate(probes):
+        nz = np.flatnonzero(a)
+        a_nz = a[nz, None]
+        step = max(1, CHUNK_BYTES // (4 * max(1, len(nz))))
+        for start in range(0, n, step):
+            # copia: se reutiliza como buffer
+            if columns is None:
+                g = gallery_t[nz, start:start + step]
+                g_sums = gallery_sums[start:start + step]
+            else:
+                cols = columns[start:start + step]
+                g = gallery_t[np.ix_(nz, cols)]
+                g_sums = gallery_sums[cols]
+            total = g + a_nz
+            g *= a_nz
+            g /= total
+            harmonic = g.sum(axis=0, dtype=np.float64)
+            sums = float(a.sum(dtype=np.float64)) + g_sums
+            out[i, start:start + step] = 2.0 * sums - 8.0 * harmonic
+    # La resta puede dejar -1e-6 donde la distancia real es 0
+    np.maximum(out, 0.0, out=out)
+    return out
+
+
+def chi_square(probes: np.ndarray, gallery: np.ndarray) -> np.ndarray:
+    """Distancias chi-cuadrado (HISTCMP_CHISQR_ALT) entre cada sonda y cada muestra -> (m, n)."""
+    gallery = np.asarray(gallery, dtype=np.float32)
+    return chi_square_binmajor(probes, np.ascontiguousarray(gallery.T),
+                               gallery.sum(axis=1, dtype=np.float64))
+
+
+class LBPHMatcher:
+    """Reconocedor LBPH a nivel de proyecto sobre una matriz de histogramas.
+
+    Args:
+        histograms: matriz (n_muestras, n_bins) de histogramas de entrenamiento
+        labels: label de cada muestra
+        radius, neighbors, grid_x, grid_y: parámetros LBPH con que se entrenó
+        shortlist: si se indica, búsqueda en dos etapas: primero contra un
+            prototipo por persona (la media de sus histogramas) y después
+            exhaustiva solo contra las muestras de las `shortlist` personas
+            más cercanas. Pasa de O(muestras) a O(personas + shortlist * muestras por persona).
+    """
+
+    def __init__(self, histograms, labels, radius: int = 1, neighbors: int = 8,
+                 grid_x: int = 8, grid_y: int = 8, shortlist: Optional[int] = None):
+        labels = np.asarray(labels, dtype=np.int32).ravel()
+        # Muestras agrupadas por label para sacar el mínimo por persona con reduceat
+        order = np.argsort(labels, kind="stable")
+        histograms = np.asarray(histograms, dtype=np.float32)[order]
+        # Galería guardada por filas de bin (n_bins, n_muestras), ver chi_square_binmajor
+        self.histograms_t = np.ascontiguousarray(histograms.T)
+        self.sums = histograms.sum(axis=1, dtype=np.float64)
+        self.labels = labels[order]
+        self._index(radius, neighbors, grid_x, grid_y, shortlist)
+
+        # Prototipos por persona (media de sus muestras), también por filas de bin
+        counts = (self.ends - self.starts).astype(np.float32)
+        prototypes = np.add.reduceat(histograms, self.starts, axis=0) / counts[:, None] \
+            if len(histograms) else np.empty((0, histograms.shape[1]), np.float32)
+        self.prototypes_t = np.ascontiguousarray(prototypes.T)
+        self.prototype_sums = prototypes.sum(axis=1, dtype=np.float64)
+
+    def _index(self, radius, neighbors, grid_x, grid_y, shortlist) -> None:
+        """Rangos por persona sobre `self.labels` (ya ordenados) y parámetros LBPH."""
+        self.people, self.starts = np.unique(self.labels, return_index=True)
+        self.ends = np.append(self.starts[1:], len(self.labels))
+        self.radius, self.neighbors = radius, neighbors
+        self.grid_x, self.grid_y = grid_x, grid_y
+        self.shortlist = shortlist
+
+    def save(self, path: str) -> None:
+        """Guarda el comparador en el formato binario (ver BIN_MAGIC).
+
+        Se guardan tal cual están en memoria: galería por filas de bin, sumas,
+        labels ordenados y prototipos, así `load` no tiene que recalcular nada.
+        """
+        arrays = {
+            "labels": np.ascontiguousarray(self.labels, dtype="<i4"),
+            "sums": np.ascontiguousarray(self.sums, dtype="<f8"),
+            "histograms_t": np.ascontiguousarray(self.histograms_t, dtype="<f4"),
+            "prototypes_t": np.ascontiguousarray(self.prototypes_t, dtype="<f4"),
+            "prototype_sums": np.ascontiguousarray(self.prototype_sums, dtype="<f8"),
+        }
+        header = {"radius": self.radius, "neighbors": self.neighbors,
+                  "grid_x": self.grid_x, "grid_y": self.grid_y, "arrays": {}}
+        # Las posiciones dependen del largo de la cabecera: se calculan con una
+        # cabecera de tamaño fijo (las posiciones se rellenan con espacios)
+        header_len = 1024 + 128 * len(arrays)
+        offset = _align(_BIN_PREFIX.size + header_len)
+        for name, arr in arrays.items():
+            header["arrays"][name] = {"offset": offset, "dtype": arr.dtype.str, "shape": list(arr.shape)}
+            offset = _align(offset + arr.nbytes)
+        raw = json.dumps(header).encode("utf-8")
+        if len(raw) > header_len:
+            raise ValueError("Cabecera del modelo binario demasiado grande")
+
+        with open(path, "wb") as fh:
+            fh.write(_BIN_PREFIX.pack(BIN_MAGIC, BIN_VERSION, header_len))
+            fh.write(raw.ljust(header_len, b" "))
+            for name, arr in arrays.items():
+                fh.seek(header["arrays"][name]["offset"])
+                fh.write(arr.tobytes())
+            fh.truncate(offset)
+
+    @classmethod
+    def load(cls, path: str, shortlist: Optional[int] = None) -> "LBPHMatcher":
+        """Abre un modelo guardado con `save` con un único memory map (sin copiar la galería)."""
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+        magic, version, header_len = _BIN_PREFIX.unpack(bytes(mm[:_BIN_PREFIX.size]))
+        if magic != BIN_MAGIC or version != BIN_VERSION:
+            raise ValueError(f"{path} no es un modelo LBPH binario v{BIN_VERSION}")
+        header = json.loads(bytes(mm[_BIN_PREFIX.size:_BIN_PREFIX.size + header_len]))
+
+        def view(name):
+            spec = header["arrays"][name]
+            dtype = np.dtype(spec["dtype"])
+            nbytes = dtype.itemsize * int(np.prod(spec["shape"]))
+            return mm[spec["offset"]:spec["offset"] + nbytes].view(dtype).reshape(spec["shape"])
+
+        self = cls.__new__(cls)
+        self.labels = view("labels")
+        self.sums = view("sums")
+        self.histograms_t = view("histograms_t")
+        self.prototypes_t = view("prototypes_t")
+        self.prototype_sums = view("prototype_sums")
+        self._index(header["radius"], header["neighbors"], header["grid_x"], header["grid_y"], shortlist)
+        return self
+
+    @classmethod
+    def from_recognizer(cls, recognizer, shortlist: Optional[int] = None) -> "LBPHMatcher":
+        """Extrae los histogramas y labels de un `cv2.face.LBPHFaceRecognizer` entrenado."""
+        hists = recognizer.getHistograms()
+        histograms = np.vstack([np.asarray(h, dtype=np.float32).reshape(1, -1) for h in hists])
+        return cls(histograms, recognizer.getLabels(),
+                   radius=recognizer.getRadius(), neighbors=recognizer.getNeighbors(),
+                   grid_x=recognizer.getGridX(), grid_y=recognizer.getGridY(),
+                   shortlist=shortlist)
+
+    def features(self, faces) -> np.ndarray:
+        return lbp_histograms(faces, self.radius, self.neighbors, self.grid_x, self.grid_y)
+
+    def person_distances(self, probes: np.ndarray) -> np.ndarray:
+        """Distancia exhaustiva de cada histograma sonda a cada persona (m, n_personas),
+        en el orden de `self.people`: la de su muestra más cercana."""
+        dists = chi_square_binmajor(probes, self.histograms_t, self.sums)
+        return np.minimum.reduceat(dists, self.starts, axis=1)
+
+    def predict_batch(self, faces: Sequence, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Los k labels más cercanos para cada cara del lote.
+
+        Returns:
+            (labels, distances), ambos de forma (m, k) y ordenados de menor a
+            mayor distancia. La distancia de cada label es la de su muestra más
+            cercana, como en `recognizer.predict`.
+        """
+        faces = np.asarray(faces)
+        if faces.ndim == 2:
+            faces = faces[None]
+        if len(faces) == 0 or len(self.labels) == 0:
+            return np.empty((len(faces), 0), np.int32), np.empty((len(faces), 0), np.float32)
+        probes = self.features(faces)
+        if self.shortlist and self.shortlist < len(self.people):
+            per_person = self._shortlisted(probes)
+        else:
+            per_person = self.person_distances(probes)
+        k = min(k, per_person.shape[1])
+        top = np.argpartition(per_person, k - 1, axis=1)[:, :k]
+        top_d = np.take_along_axis(per_person, top, axis=1)
+        order = np.argsort(top_d, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return self.people[top], np.take_along_axis(top_d, order, axis=1)
+
+    def _shortlisted(self, probes: np.ndarray) -> np.ndarray:
+        """Distancia por persona en dos etapas; las personas descartadas quedan en inf."""
+        proto = chi_square_binmajor(probes, self.prototypes_t, self.prototype_sums)
+        candidates = np.argpartition(proto, self.shortlist - 1, axis=1)[:, :self.shortlist]
+        per_person = np.full(proto.shape, np.inf, dtype=np.float32)
+        for i, cand in enumerate(candidates):
+            cand = np.sort(cand)
+            lengths = self.ends[cand] - self.starts[cand]
+            columns = np.concatenate([np.arange(a, b) for a, b in zip(self.starts[cand], self.ends[cand])])
+            dists = chi_square_binmajor(probes[i:i + 1], self.histograms_t, self.sums, columns)
+            seg_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            per_person[i, cand] = np.minimum.reduceat(dists[0], seg_starts)
+        return per_person
+
+    def predict(self, face) -> Tuple[int, float]:
+        """Igual que `recognizer.predict(face)`: (label, distancia) del más cercano."""
+        labels, dists = self.predict_batch(face, k=1)
+        if labels.shape[1] == 0:
+            return -1, float("inf")
+        return int(labels[0, 0]), float(dists[0, 0])
+
+
+def _align(offset: int) -> int:
+    return (offset + BIN_ALIGN - 1) // BIN_ALIGN * BIN_ALIGN
+
+
+def holdout_mask(labels, holdout_every: int = 5) -> np.ndarray:
+    """Split fijo: de cada persona, una de cada `holdout_every` muestras es sonda (True)."""
+    seen: dict = {}
+    is_probe = np.zeros(len(labels), dtype=bool)
+    for i, lab in enumerate(labels):
+        seen[lab] = seen.get(lab, -1) + 1
+        is_probe[i] = seen[lab] % holdout_every == 0
+    return is_probe
+
+
+def evaluate_shortlist(histograms, labels, shortlists: Sequence[int],
+                       holdout_every: int = 5) -> list:
+    """Compara la búsqueda exhaustiva con la de dos etapas sobre un split fijo.
+
+    De cada persona, una de cada `holdout_every` muestras es sonda y el resto
+    galería. Devuelve una fila por configuración (None = exhaustiva) con la
+    precisión top-1, el acuerdo con la exhaustiva, ms por sonda y aceleración.
+    """
+    histograms = np.asarray(histograms, dtype=np.float32)
+    labels = np.asarray(labels).ravel()
+    is_probe = holdout_mask(labels, holdout_every)
+    probes, truth = histograms[is_probe], labels[is_probe]
+
+    rows, exact_pred, exact_ms = [], None, None
+    for shortlist in [None, *shortlists]:
+        matcher = LBPHMatcher(histograms[~is_probe], labels[~is_probe], shortlist=shortlist)
+        t0 = time.perf_counter()
+        if shortlist and shortlist < len(matcher.people):
+            per_person = matcher._shortlisted(probes)
+        else:
+            per_person = matcher.person_distances(probes)
+        ms = (time.perf_counter() - t0) * 1000.0 / max(1, len(probes))
+        pred = matcher.people[np.argmin(per_person, axis=1)]
+        if shortlist is None:
+            exact_pred, exact_ms = pred, ms
+        rows.append({
+            "shortlist": shortlist,
+            "accuracy": float(np.mean(pred == truth)) if len(truth) else 0.0,
+            "agreement": float(np.mean(pred == exact_pred)) if len(truth) else 0.0,
+            "ms_per_probe": ms,
+            "speedup": exact_ms / ms if ms > 0 else float("inf"),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    from pathlib import Path
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from FRT.entrenar_modelo import load_dataset
+
+    parser = argparse.ArgumentParser(description="Precisión vs velocidad del preselector por prototipos")
+    parser.add_argument("--shortlist", type=int, nargs="+", default=[1, 2, 3, 5],
+                        help="personas candidatas a revisar en la segunda etapa")
+    parser.add_argument("--holdout-every", type=int, default=5,
+                        help="una de cada N fotos de cada persona se usa como sonda")
+    args = parser.parse_args()
+
+    faces, person_ids, _ = load_dataset()
+    if len(faces) == 0:
+        raise SystemExit("No hay caras en faces/.")
+    hists = np.vstack([lbp_histograms(faces[i:i + 256]) for i in range(0, len(faces), 256)])
+    print(f"{len(faces)} caras de {len(set(person_ids))} personas")
+    print(f"{'shortlist':>9} {'precisión':>9} {'acuerdo':>8} {'ms/sonda':>9} {'acelera':>8}")
+    for row in evaluate_shortlist(hists, person_ids.astype(np.int64), args.shortlist, args.holdout_every):
+        name = "exacta" if row["shortlist"] is None else str(row["shortlist"])
+        print(f"{name:>9} {row['accuracy']:>9.3f} {row['agreement']:>8.3f} "
+              f"{row['ms_per_probe']:>9.2f} {row['speedup']:>7.2f}x")
@@ -0,0 +1,164 @@
+"""Detector de rostros compartido (Haar cascade).
+
+El XML del clasificador se parsea una sola vez por hilo y se reutiliza en
+cada fotograma. `CascadeClassifier.detectMultiScale` no es seguro para usar
+desde varios hilos a la vez, por eso `get_detector()` entrega una instancia
+por hilo.
+
+Con `detect_width` el clasificador corre sobre una copia reducida del
+fotograma (p. ej. 320 px de ancho) y las cajas se devuelven en coordenadas
+del fotograma original, para recortar la cara a resolución completa.
+
+Medir la latencia por ancho de detección:
+    python FRT/detector.py --widths 0 320 480 640 --frames 200
+"""
+import argparse
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+
+try:
+    from FRT.fuentes import open_source
+except ImportError:
+    from fuentes import open_source
+
+CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+SCALE_FACTOR = 1.3   # Factor de escala entre pasadas del clasificador
+MIN_NEIGHBORS = 5    # Vecinos mínimos para validar una cara
+
+Box = Tuple[int, int, int, int]
+
+
+class FaceDetector:
+    """Envuelve un `cv2.CascadeClassifier` cargado una única vez.
+
+    Args:
+        detect_width: si se indica, ancho en píxeles de la copia reducida sobre
+            la que corre el clasificador. None detecta a resolución completa.
+    """
+
+    def __init__(self, cascade_path: str = CASCADE_PATH,
+                 scale_factor: float = SCALE_FACTOR,
+                 min_neighbors: int = MIN_NEIGHBORS,
+                 detect_width: Optional[int] = None):
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise RuntimeError(f"No pude cargar el clasificador: {cascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.detect_width = detect_width
+
+    def detect(self, gray) -> List[Box]:
+        """Devuelve todas las caras detectadas como (x, y, w, h) en coordenadas de `gray`."""
+        height, width = gray.shape[:2]
+        scale = 1.0
+        small = gray
+        if self.detect_width and width > self.detect_width:
+            scale = self.detect_width / float(width)
+            small = cv2.resize(gray, (self.detect_width, max(1, round(height * scale))),
+                               interpolation=cv2.INTER_AREA)
+
+        faces = self.cascade.detectMultiScale(small, self.scale_factor, self.min_neighbors)
+        if scale == 1.0:
+            return [tuple(int(v) for v in f) for f in faces]
+
+        # Volver a coordenadas del fotograma completo (recortando a los bordes)
+        boxes = []
+        for (x, y, w, h) in faces:
+            x0 = max(0, int(round(x / scale)))
+            y0 = max(0, int(round(y / scale)))
+            x1 = min(width, int(round((x + w) / scale)))
+            y1 = min(height, int(round((y + h) / scale)))
+            boxes.append((x0, y0, x1 - x0, y1 - y0))
+        return boxes
+
+    def detect_largest(self, gray) -> Optional[Box]:
+        """Devuelve la cara de mayor área (la más cercana) o None."""
+        faces = self.detect(gray)
+        if not faces:
+            return None
+        return max(faces, key=lambda r: r[2] * r[3])
+
+
+_local = threading.local()
+
+
+def get_detector(detect_width: Optional[int] = None) -> FaceDetector:
+    """Devuelve el detector del hilo actual para ese ancho, creándolo la primera vez."""
+    detectors: Dict[Optional[int], FaceDetector] = getattr(_local, "detectors", None)
+    if detectors is None:
+        detectors = _local.detectors = {}
+    detector = detectors.get(detect_width)
+    if detector is None:
+        detector = detectors[detect_width] = FaceDetector(detect_width=detect_width)
+    return detector
+
+
+def _percentile(values: Sequence[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def benchmark_widths(frames: Sequence, widths: Sequence[Optional[int]]) -> List[dict]:
+    """Mide la latencia de detección por fotograma para cada ancho.
+
+    Args:
+        frames: fotogramas en escala de grises (todos se procesan con cada ancho)
+        widths: anchos de detección a probar (None o 0 = resolución completa)
+
+    Returns:
+        una fila por ancho con latencias en ms y la cantidad de fotogramas con cara
+    """
+    rows = []
+    for width in widths:
+        detector = FaceDetector(detect_width=width or None)
+        detector.detect(frames[0])  # calentamiento
+        times, hits = [], 0
+        for gray in frames:
+            t0 = time.perf_counter()
+            faces = detector.detect(gray)
+            times.append((time.perf_counter() - t0) * 1000.0)
+            hits += 1 if faces else 0
+        rows.append({
+            "width": width or frames[0].shape[1],
+            "mean_ms": sum(times) / len(times),
+            "p50_ms": _percentile(times, 50),
+            "p95_ms": _percentile(times, 95),
+            "frames_with_face": hits,
+            "frames": len(frames),
+        })
+    return rows
+
+
+def _read_frames(source: str, n_frames: int) -> List:
+    """Lee hasta `n_frames` fotogramas en gris de cualquier fuente (ver FRT/fuentes.py)."""
+    frames = []
+    with open_source(source) as src:
+        for frame in src:
+            if len(frames) >= n_frames:
+                break
+            frames.append(cv2.cvtColor(frame.image, cv2.COLOR_BGR2GRAY))
+    return frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latencia de detección por ancho de reducción")
+    parser.add_argument("--source", default="0", help="índice de cámara, video, carpeta de imágenes o URL")
+    parser.add_argument("--widths", type=int, nargs="+", default=[0, 320, 480, 640],
+                        help="anchos de detección (0 = resolución completa)")
+    parser.add_argument("--frames", type=int, default=200, help="fotogramas a medir")
+    args = parser.parse_args()
+
+    frames = _read_frames(args.source, args.frames)
+    if not frames:
+        raise SystemExit("No se pudo leer ningún fotograma.")
+    print(f"{len(frames)} fotogramas de {frames[0].shape[1]}x{frames[0].shape[0]}")
+    print(f"{'ancho':>6} {'media ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'con cara':>9}")
+    for row in benchmark_widths(frames, args.widths):
+        print(f"{row['width']:>6} {row['mean_ms']:>9.2f} {row['p50_ms']:>8.2f} "
+              f"{row['p95_ms']:>8.2f} {row['frames_with_face']:>5}/{row['frames']}")
@@ -0,0 +1,94 @@
+"""Directorio de personas en memoria para el reconocimiento.
+
+Carga una vez `id -> nombre` desde la tabla `personas` y lo mantiene al día
+desde un hilo de fondo: la conexión de ese hilo (del repositorio compartido
+de GUI_DataBase/Data_Base.py) consulta `PRAGMA data_version` (cambia cuando
+otra conexión hace commit, p. ej. la GUI) y el mtime del archivo (por si la
+BD se reemplaza entera). Las consultas del bucle de reconocimiento son solo
+lecturas de un diccionario, nunca tocan el disco.
+"""
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+from config import DB_PATH
+from GUI_DataBase.Data_Base import get_repository
+
+POLL_INTERVAL = 2.0  # Segundos entre comprobaciones de cambios en la BD
+
+
+class PersonDirectory:
+    """Copia en memoria de `personas` indexada por id (como string)."""
+
+    def __init__(self, db_path: str = DB_PATH, poll_interval: float = POLL_INTERVAL):
+        self.db_path = db_path
+        self.repo = get_repository(db_path)
+        self.poll_interval = poll_interval
+        self._people: Dict[str, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reload()
+
+    def reload(self) -> None:
+        """Vuelve a leer la tabla completa y reemplaza el diccionario de una vez."""
+        try:
+            people = self.repo.nombres()
+        except sqlite3.Error as e:
+            print(f"No pude leer personas de la BD: {e}")
+            return
+        # Reemplazo atómico: los lectores ven el diccionario viejo o el nuevo
+        self._people = people
+
+    def get(self, person_id) -> Optional[str]:
+        """Nombre de la persona o None si no está en la BD."""
+        if person_id is None:
+            return None
+        return self._people.get(str(person_id))
+
+    def __contains__(self, person_id) -> bool:
+        return person_id is not None and str(person_id) in self._people
+
+    def __len__(self) -> int:
+        return len(self._people)
+
+    def start(self) -> "PersonDirectory":
+        """Arranca el hilo que recarga el directorio cuando cambia la BD."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="person-directory", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1.0)
+            self._thread = None
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.db_path).st_mtime
+        except OSError:
+            return None
+
+    def _watch(self) -> None:
+        last_version, last_mtime = None, self._mtime()
+        while not self._stop.wait(self.poll_interval):
+            try:
+                if last_version is None:
+                    last_version = self.repo.data_version()
+                version = self.repo.data_version()
+                mtime = self._mtime()
+                if mtime != last_mtime:
+                    # Archivo reemplazado: la conexión larga apunta al viejo
+                    self.repo.reconnect()
+                    version = self.repo.data_version()
+                if version != last_version or mtime != last_mtime:
+                    last_version, last_mtime = version, mtime
+                    self.reload()
+            except sqlite3.Error:
+                # La BD pudo haberse reemplazado: reconectar en la próxima vuelta
+                self.repo.reconnect()
+                last_version = None
+        self.repo.reconnect()
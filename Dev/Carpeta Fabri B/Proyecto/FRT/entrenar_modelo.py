@@ -1,9 +1,26 @@
 # Entrenamiento: usar rutas desde config y mapear label -> person_id
+import argparse
+import os
+import time
 import cv2
 import numpy as np
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from config import FACES_DIR, MODEL_PATH, LABELS_PATH
+from config import (FACES_DIR, FACES_PACK_PATH, FACES_PACK_LABELS_PATH,
+                    FACES_PACK_MANIFEST_PATH)
+
+try:
+    from FRT.versiones_modelo import (LABELS_FILE, META_FILE, MODEL_BIN_FILE, MODEL_FILE,
+                                      TRAIN_MANIFEST_FILE, model_files, publish_version)
+    from FRT.comparador_lbph import LBPHMatcher
+except ImportError:
+    from versiones_modelo import (LABELS_FILE, META_FILE, MODEL_BIN_FILE, MODEL_FILE,
+                                  TRAIN_MANIFEST_FILE, model_files, publish_version)
+    from comparador_lbph import LBPHMatcher
+
+FACE_SIZE = (200, 200)              # Tamaño de las caras guardadas en el paquete
+LOAD_WORKERS = os.cpu_count() or 1  # Hilos para decodificar PNG al entrenar
 
 
 def list_people():
@@ -13,67 +30,245 @@ def list_people():
     return sorted([p.name for p in root.iterdir() if p.is_dir()])
 
 
-def train_model():
-    people = list_people()
-    if not people:
-        print("No hay carpetas en faces/. Enrolá primero.")
-        return False
+def scan_faces():
+    """Foto actual de faces/: {person_id: {archivo: [mtime_ns, size]}} (solo carpetas con PNG)."""
+    snapshot = {}
+    for person_id in list_people():
+        files = {}
+        for f in sorted((Path(FACES_DIR) / person_id).glob("*.png")):
+            st = f.stat()
+            files[f.name] = [st.st_mtime_ns, st.st_size]
+        if files:
+            snapshot[person_id] = files
+    return snapshot
 
-    images, labels = [], []
-    person_to_label = {}
-    label_to_person = {}
-    next_label = 1
 
-    # Si ya existe un labels.json previo, cargar mapping (label -> person_id)
-    labels_path = Path(LABELS_PATH)
+def _load_labels(files):
+    """Carga labels.json de la versión `files` como (label_to_person, person_to_label, next_label)."""
+    label_to_person = {}
+    labels_path = Path(files[LABELS_FILE])
     if labels_path.exists():
         label_to_person = json.loads(labels_path.read_text(encoding="utf-8"))
         label_to_person = {int(k): v for k, v in label_to_person.items()}
-        person_to_label = {v: k for k, v in label_to_person.items()}
-        if person_to_label:
-            next_label = max(person_to_label.values()) + 1
+    person_to_label = {v: k for k, v in label_to_person.items()}
+    next_label = max(person_to_label.values()) + 1 if person_to_label else 1
+    return label_to_person, person_to_label, next_label
 
-    from pathlib import Path as _P
-    for person_id in people:
-        person_dir = _P(FACES_DIR) / person_id
-        files = sorted([*person_dir.glob("*.png")])
-        if not files:
-            continue
 
+def _read_gray(path):
+    return cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+
+
+def load_images(paths, workers=None):
+    """Decodifica `paths` en escala de grises con un pool de hilos.
+
+    `cv2.imread` libera el GIL mientras decodifica, así que los hilos escalan
+    con los núcleos sin copiar las imágenes entre procesos. El resultado queda
+    en el mismo orden que `paths` (None donde no se pudo leer), lo que mantiene
+    el orden de labels determinista.
+    """
+    workers = workers or LOAD_WORKERS
+    t0 = time.perf_counter()
+    if workers <= 1 or len(paths) < 2:
+        images = [_read_gray(p) for p in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            images = list(pool.map(_read_gray, paths))
+    elapsed = time.perf_counter() - t0
+    if paths:
+        rate = len(paths) / elapsed if elapsed > 0 else float("inf")
+        print(f"[Carga] {len(paths)} imágenes en {elapsed:.2f} s ({rate:.0f} img/s, {workers} hilos)")
+    return images
+
+
+def _open_pack():
+    """Abre el paquete existente (memory-mapped) y su manifiesto, o (None, None, [])."""
+    try:
+        entries = json.loads(Path(FACES_PACK_MANIFEST_PATH).read_text(encoding="utf-8"))
+        faces = np.load(FACES_PACK_PATH, mmap_mode="r")
+        person_ids = np.load(FACES_PACK_LABELS_PATH)
+    except (OSError, ValueError):
+        return None, None, []
+    if (faces.shape[1:] != (FACE_SIZE[1], FACE_SIZE[0])
+            or len(faces) != len(entries) or len(person_ids) != len(entries)):
+        return None, None, []
+    return faces, person_ids, entries
+
+
+def load_dataset(snapshot=None, workers=None):
+    """Devuelve todas las caras de faces/ como (faces, person_ids, entries).
+
+    `faces` es un array uint8 N x 200 x 200 memory-mapped desde FACES_PACK_PATH,
+    `person_ids` el person_id de cada fila y `entries` el manifiesto por fila
+    ({"path", "mtime", "size"}). Solo se decodifican los PNG nuevos o
+    modificados desde la última vez; si nada cambió no se escribe nada.
+    """
+    if snapshot is None:
+        snapshot = scan_faces()
+
+    wanted = []
+    for person_id in sorted(snapshot):
+        for name, (mtime, size) in snapshot[person_id].items():
+            wanted.append({"path": f"{person_id}/{name}", "mtime": mtime, "size": size})
+
+    faces, person_ids, entries = _open_pack()
+    cached = {e["path"]: (i, e["mtime"], e["size"]) for i, e in enumerate(entries)}
+
+    sources, to_decode = [], []
+    for e in wanted:
+        hit = cached.get(e["path"])
+        if hit is not None and hit[1] == e["mtime"] and hit[2] == e["size"]:
+            sources.append(hit[0])
+        else:
+            sources.append(None)
+            to_decode.append(Path(FACES_DIR) / e["path"])
+
+    if not to_decode and faces is not None and sources == list(range(len(entries))):
+        return faces, person_ids, entries
+
+    decoded = iter(load_images(to_decode, workers))
+    rows, kept = [], []
+    for e, src in zip(wanted, sources):
+        if src is None:
+            img = next(decoded)
+            if img is None:
+                continue
+            if img.shape != (FACE_SIZE[1], FACE_SIZE[0]):
+                img = cv2.resize(img, FACE_SIZE)
+            rows.append(img)
+        else:
+            rows.append(src)
+        kept.append(e)
+
+    # Escribir el paquete nuevo en un temporal y reemplazar de una vez
+    Path(FACES_PACK_PATH).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = FACES_PACK_PATH + ".tmp"
+    out = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8,
+                                    shape=(len(kept), FACE_SIZE[1], FACE_SIZE[0]))
+    for i, row in enumerate(rows):
+        out[i] = faces[row] if isinstance(row, int) else row
+    out.flush()
+    del out, faces
+    os.replace(tmp_path, FACES_PACK_PATH)
+
+    person_ids = np.array([e["path"].split("/", 1)[0] for e in kept], dtype=str)
+    np.save(FACES_PACK_LABELS_PATH, person_ids)
+    with open(FACES_PACK_MANIFEST_PATH, 'w', encoding='utf-8') as fh:
+        json.dump(kept, fh, ensure_ascii=False)
+    print(f"[Paquete] {len(kept)} caras ({len(to_decode)} decodificadas) en {FACES_PACK_PATH}")
+
+    return np.load(FACES_PACK_PATH, mmap_mode="r"), person_ids, kept
+
+
+def _save(recognizer, label_to_person, snapshot):
+    # Todo se escribe en una versión nueva que se publica de una vez: un
+    # reconocedor que esté leyendo ve la versión anterior completa o la nueva.
+    # El umbral calibrado (META_FILE) se hereda de la versión anterior.
+    with publish_version(inherit=[META_FILE]) as vdir:
+        # El YAML de OpenCV se necesita para `update` incremental; el reconocimiento
+        # carga la copia binaria, que se abre con un memory map en milisegundos
+        recognizer.save(os.path.join(vdir, MODEL_FILE))
+        LBPHMatcher.from_recognizer(recognizer).save(os.path.join(vdir, MODEL_BIN_FILE))
+
+        # Guardar label -> person_id (keys como strings en JSON)
+        with open(os.path.join(vdir, LABELS_FILE), 'w', encoding='utf-8') as fh:
+            json.dump({str(k): v for k, v in label_to_person.items()}, fh, ensure_ascii=False, indent=2)
+
+        # Guardar qué archivos entraron al modelo, para poder actualizarlo incrementalmente
+        with open(os.path.join(vdir, TRAIN_MANIFEST_FILE), 'w', encoding='utf-8') as fh:
+            json.dump(snapshot, fh, ensure_ascii=False)
+
+    print(f"[OK] Modelo guardado en {model_files()[MODEL_FILE]}")
+
+
+def _plan_incremental(snapshot, files):
+    """Devuelve la lista de personas nuevas a agregar con `update` a la versión
+    `files`, o None si hace falta reentrenar todo (persona eliminada, fotos
+    cambiadas o sin modelo previo)."""
+    manifest_path = Path(files[TRAIN_MANIFEST_FILE])
+    if not (Path(files[MODEL_FILE]).exists() and Path(files[LABELS_FILE]).exists()
+            and manifest_path.exists()):
+        return None
+    try:
+        trained = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+
+    for person_id, trained_files in trained.items():
+        if person_id not in snapshot:
+            print(f"Se eliminó id={person_id}: se reentrena completo.")
+            return None
+        if snapshot[person_id] != trained_files:
+            print(f"Cambiaron las imágenes de id={person_id}: se reentrena completo.")
+            return None
+    return [p for p in snapshot if p not in trained]
+
+
+def train_model(incremental: bool = False, workers=None):
+    """Entrena el modelo LBPH con las fotos de faces/.
+
+    Con `incremental=True` se carga el modelo existente y solo se pasan por
+    `LBPHFaceRecognizer.update` las fotos de las personas nuevas. Si alguna
+    persona ya entrenada se eliminó o cambiaron sus fotos, se reentrena completo.
+    `workers` es la cantidad de hilos para decodificar (por defecto LOAD_WORKERS).
+    """
+    snapshot = scan_faces()
+    if not snapshot:
+        print("No hay carpetas en faces/. Enrolá primero.")
+        return False
+
+    # Versión vigente al empezar: labels, manifiesto y modelo salen todos de la misma
+    files = model_files()
+    label_to_person, person_to_label, next_label = _load_labels(files)
+
+    new_people = _plan_incremental(snapshot, files) if incremental else None
+    if new_people is not None:
+        if not new_people:
+            print("[OK] El modelo ya está al día, no hay personas nuevas.")
+            return True
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        recognizer.read(files[MODEL_FILE])
+        people = new_people
+    else:
+        recognizer = cv2.face.LBPHFaceRecognizer_create()
+        people = sorted(snapshot)
+
+    for person_id in people:
         if person_id not in person_to_label:
             person_to_label[person_id] = next_label
             label_to_person[next_label] = person_id
             next_label += 1
 
-        lab = person_to_label[person_id]
-
-        for f in files:
-            img = cv2.imread(str(f), cv2.IMREAD_GRAYSCALE)
-            if img is None:
-                continue
-            images.append(img)
-            labels.append(lab)
+    # Las caras salen del paquete memory-mapped: solo se decodifican PNG nuevos
+    faces, person_ids, _ = load_dataset(snapshot, workers)
+    wanted = set(people)
+    images, labels = [], []
+    for i, person_id in enumerate(person_ids):
+        if person_id in wanted:
+            images.append(np.asarray(faces[i]))
+            labels.append(person_to_label[person_id])
 
     if not images:
         print("No hay imágenes para entrenar.")
         return False
 
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    recognizer.train(images, np.array(labels))
-
-    Path(MODEL_PATH).parent.mkdir(parents=True, exist_ok=True)
-    recognizer.save(str(MODEL_PATH))
-
-    # Guardar label -> person_id (keys como strings en JSON)
-    with open(LABELS_PATH, 'w', encoding='utf-8') as fh:
-        json.dump({str(k): v for k, v in label_to_person.items()}, fh, ensure_ascii=False, indent=2)
+    if new_people is not None:
+        recognizer.update(images, np.array(labels))
+        print(f"[OK] Modelo actualizado con {len(new_people)} persona(s) nueva(s): {', '.join(new_people)}")
+    else:
+        recognizer.train(images, np.array(labels))
 
-    print(f"[OK] Modelo guardado en {MODEL_PATH}")
-    print(f"[OK] Labels guardados en {LABELS_PATH}")
+    _save(recognizer, label_to_person, snapshot)
     return True
 
 
 if __name__ == "__main__":
-    trained = train_model()
+    parser = argparse.ArgumentParser(description="Entrenar el modelo LBPH con las fotos de faces/")
+    parser.add_argument("--incremental", action="store_true",
+                        help="agregar solo personas nuevas al modelo existente")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"hilos para decodificar imágenes (por defecto {LOAD_WORKERS})")
+    args = parser.parse_args()
+    trained = train_model(incremental=args.incremental, workers=args.workers)
     if not trained:
         raise SystemExit(1)
@@ -0,0 +1,97 @@
+"""Escritura de muestras en segundo plano.
+
+`cv2.imwrite` codifica el PNG y escribe a disco en el hilo que lo llama; en
+una tarjeta SD lenta eso frena la captura. `SampleWriter` recibe las caras en
+una cola en memoria y un hilo propio las codifica y escribe por lotes, así el
+ritmo de captura no depende de la velocidad del almacenamiento.
+"""
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+
+PNG_COMPRESSION = 3   # Nivel de compresión PNG (0 = rápido/grande ... 9 = lento/chico)
+BATCH_SIZE = 8        # Muestras que el hilo escritor toma de la cola por vuelta
+
+_STOP = object()
+
+
+class SampleWriter:
+    """Hilo escritor de imágenes con cola en memoria.
+
+    `submit(path, image)` no bloquea; `close()` espera a que se escriba todo lo
+    encolado y relanza el primer error de escritura si lo hubo.
+    """
+
+    def __init__(self, compression: int = PNG_COMPRESSION, batch_size: int = BATCH_SIZE):
+        self.params = [cv2.IMWRITE_PNG_COMPRESSION, int(compression)]
+        self.batch_size = batch_size
+        self.written = 0
+        self.bytes = 0
+        self.busy_s = 0.0
+        self.error: Optional[BaseException] = None
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="sample-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, path, image) -> None:
+        """Encola `image` para escribirla en `path` (no se debe modificar después)."""
+        if self.error is not None:
+            raise self.error
+        self._queue.put((Path(path), image))
+
+    def _take_batch(self) -> Tuple[List, bool]:
+        batch, stop = [], False
+        item = self._queue.get()
+        while True:
+            if item is _STOP:
+                stop = True
+            else:
+                batch.append(item)
+            if stop or len(batch) >= self.batch_size:
+                break
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+        return batch, stop
+
+    def _loop(self) -> None:
+        while True:
+            batch, stop = self._take_batch()
+            t0 = time.perf_counter()
+            for path, image in batch:
+                try:
+                    ok, buf = cv2.imencode(path.suffix or ".png", image, self.params)
+                    if not ok:
+                        raise IOError(f"No pude codificar {path.name}")
+                    path.write_bytes(buf.tobytes())
+                    self.written += 1
+                    self.bytes += len(buf)
+                except Exception as e:
+                    if self.error is None:
+                        self.error = e
+            self.busy_s += time.perf_counter() - t0
+            for _ in range(len(batch) + int(stop)):
+                self._queue.task_done()
+            if stop:
+                return
+
+    def flush(self) -> None:
+        """Espera a que se escriba todo lo encolado hasta ahora."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Escribe lo pendiente, detiene el hilo y relanza el primer error."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def report(self) -> str:
+        return (f"{self.written} archivos, {self.bytes / 1024:.0f} KiB, "
+                f"{self.busy_s * 1000:.0f} ms escribiendo")
@@ -0,0 +1,203 @@
+"""Fuentes de fotogramas: cámara, video, carpeta de imágenes o stream de red.
+
+Todas exponen la misma interfaz:
+
+- `read() -> (ok, imagen)`, igual que `cv2.VideoCapture.read`, para usarlas
+  directamente como `read_fn` del pipeline;
+- `read_frame() -> Frame | None`, con la marca de tiempo y el índice del
+  fotograma;
+- iteración (`for frame in source`) sobre objetos `Frame`;
+- `live`: True si la fuente produce fotogramas a su ritmo (cámara, stream)
+  y False si se leen a demanda (video, carpeta), donde no hay que perder ninguno.
+
+`open_source(spec)` elige la fuente a partir de un índice de cámara, una ruta
+o una URL, así los bucles de enrolamiento y reconocimiento pueden repetir
+grabaciones y medirse offline de forma determinista.
+"""
+import time
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import cv2
+
+CAMERA_WIDTH = 1280                  # Resolución pedida a cámaras y streams
+CAMERA_HEIGHT = 720
+IMAGE_DIR_FPS = 30.0                 # Cadencia supuesta para las carpetas de imágenes
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+STREAM_RECONNECTS = 3                # Reintentos si un stream de red se corta
+
+
+class Frame(NamedTuple):
+    """Un fotograma BGR con su marca de tiempo (segundos) e índice en la fuente."""
+    image: object
+    timestamp: float
+    index: int
+
+
+class FrameSource:
+    """Base de las fuentes: las subclases implementan `_grab() -> (ok, imagen, timestamp)`."""
+
+    live = True  # Ver el docstring del módulo
+
+    def __init__(self, name: str):
+        self.name = name
+        self.index = 0
+
+    def _grab(self) -> Tuple[bool, object, float]:
+        raise NotImplementedError
+
+    def read_frame(self) -> Optional[Frame]:
+        ok, image, timestamp = self._grab()
+        if not ok:
+            return None
+        frame = Frame(image, timestamp, self.index)
+        self.index += 1
+        return frame
+
+    def read(self) -> Tuple[bool, object]:
+        frame = self.read_frame()
+        return (False, None) if frame is None else (True, frame.image)
+
+    def __iter__(self) -> Iterator[Frame]:
+        while True:
+            frame = self.read_frame()
+            if frame is None:
+                return
+            yield frame
+
+    def release(self) -> None:
+        pass
+
+    def __enter__(self) -> "FrameSource":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class _CaptureSource(FrameSource):
+    """Fuente respaldada por `cv2.VideoCapture`."""
+
+    def __init__(self, target, name: str):
+        super().__init__(name)
+        self.target = target
+        self.cap = self._open()
+
+    def _open(self) -> cv2.VideoCapture:
+        cap = cv2.VideoCapture(self.target)
+        if not cap.isOpened():
+            raise RuntimeError(f"No pude abrir la fuente: {self.name}")
+        return cap
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+class CameraSource(_CaptureSource):
+    """Cámara local por índice; la marca de tiempo es el reloj monotónico."""
+
+    def __init__(self, index: int = 0, width: int = CAMERA_WIDTH, height: int = CAMERA_HEIGHT):
+        self.width, self.height = width, height
+        super().__init__(index, f"cámara {index}")
+
+    def _open(self) -> cv2.VideoCapture:
+        cap = cv2.VideoCapture(self.target)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        if not cap.isOpened():
+            raise RuntimeError("No pude abrir la cámara.")
+        return cap
+
+    def _grab(self) -> Tuple[bool, object, float]:
+        ok, image = self.cap.read()
+        return ok, image, time.monotonic()
+
+
+class VideoFileSource(_CaptureSource):
+    """Archivo de video; la marca de tiempo es la posición dentro del video.
+
+    Se lee tan rápido como se pueda decodificar (sin esperar al ritmo real),
+    así la misma grabación da siempre la misma secuencia de fotogramas.
+    """
+
+    live = False
+
+    def __init__(self, path: Union[str, Path]):
+        super().__init__(str(path), str(path))
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or IMAGE_DIR_FPS
+
+    def _grab(self) -> Tuple[bool, object, float]:
+        ok, image = self.cap.read()
+        msec = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        timestamp = msec / 1000.0 if msec > 0 else self.index / self.fps
+        return ok, image, timestamp
+
+
+class StreamSource(_CaptureSource):
+    """Stream de red (rtsp://, http://...); reconecta si la conexión se corta."""
+
+    def __init__(self, url: str, reconnects: int = STREAM_RECONNECTS):
+        self.reconnects = reconnects
+        super().__init__(url, url)
+
+    def _grab(self) -> Tuple[bool, object, float]:
+        ok, image = self.cap.read()
+        attempts = 0
+        while not ok and attempts < self.reconnects:
+            attempts += 1
+            print(f"Se cortó {self.name}, reconectando ({attempts}/{self.reconnects})...")
+            self.cap.release()
+            time.sleep(0.5 * attempts)
+            self.cap = cv2.VideoCapture(self.target)
+            ok, image = self.cap.read()
+        return ok, image, time.monotonic()
+
+
+class ImageDirSource(FrameSource):
+    """Carpeta de imágenes en orden alfabético, a una cadencia supuesta de `fps`."""
+
+    live = False
+
+    def __init__(self, path: Union[str, Path], fps: float = IMAGE_DIR_FPS):
+        super().__init__(str(path))
+        self.fps = fps
+        self.files: List[Path] = sorted(f for f in Path(path).iterdir()
+                                        if f.suffix.lower() in IMAGE_EXTENSIONS)
+        if not self.files:
+            raise RuntimeError(f"No hay imágenes en {path}")
+
+    def _grab(self) -> Tuple[bool, object, float]:
+        while self.index < len(self.files):
+            image = cv2.imread(str(self.files[self.index]), cv2.IMREAD_COLOR)
+            if image is not None:
+                return True, image, self.index / self.fps
+            self.files.pop(self.index)  # ilegible: se saltea sin consumir índice
+        return False, None, 0.0
+
+
+def open_source(spec: Union[int, str, Path, FrameSource] = 0) -> FrameSource:
+    """Abre la fuente descrita por `spec`.
+
+    - entero o cadena numérica: índice de cámara
+    - URL (contiene "://"): stream de red
+    - carpeta: imágenes en orden alfabético
+    - cualquier otra ruta: archivo de video
+    Si `spec` ya es una `FrameSource`, se devuelve tal cual.
+    """
+    if isinstance(spec, FrameSource):
+        return spec
+    if isinstance(spec, int):
+        return CameraSource(spec)
+    spec = str(spec)
+    if spec.isdigit():
+        return CameraSource(int(spec))
+    if "://" in spec:
+        return StreamSource(spec)
+    if Path(spec).is_dir():
+        return ImageDirSource(spec)
+    if not Path(spec).exists():
+        raise RuntimeError(f"No existe la fuente: {spec}")
+    return VideoFileSource(spec)
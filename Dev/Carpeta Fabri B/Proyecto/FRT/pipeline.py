@@ -0,0 +1,230 @@
+"""Pipeline de tres etapas: captura -> procesamiento -> render.
+
+Cada etapa corre en su propio hilo (el render en el hilo que llama a
+`run()`, porque `cv2.imshow` tiene que quedarse en un único hilo) y se
+conectan con colas de un solo lugar que descartan el fotograma pendiente
+cuando llega uno nuevo. Así un `predict` lento hace que se salteen
+fotogramas en vez de acumular retraso, y la cámara se sigue vaciando al
+ritmo del driver.
+
+Con fuentes que no son en vivo (`live=False`: video, carpeta de imágenes)
+no hay ritmo que sostener: las colas bloquean en lugar de descartar y al
+terminar la fuente se procesan y muestran todos los fotogramas en vuelo,
+así el resultado no depende de la velocidad de la máquina.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Tuple
+
+BLOCKING_QUEUE_SIZE = 4   # Fotogramas en vuelo entre etapas con fuentes que no son en vivo
+
+_END = object()  # Fin de la fuente: recorre las etapas detrás del último fotograma
+
+
+class LatestQueue:
+    """Cola acotada de un solo lugar: `put` reemplaza el elemento no consumido."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item) -> None:
+        with self._cond:
+            if self._has_item:
+                self.dropped += 1
+            self._item = item
+            self._has_item = True
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Tuple[bool, Any]:
+        """Devuelve (True, item) o (False, None) si la cola se cerró o venció el timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._has_item or self._closed, timeout):
+                return False, None
+            if not self._has_item:
+                return False, None
+            item, self._item, self._has_item = self._item, None, False
+            return True, item
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class BlockingQueue:
+    """Cola acotada sin descartes: `put` espera lugar. Misma interfaz que LatestQueue."""
+
+    def __init__(self, maxsize: int = BLOCKING_QUEUE_SIZE):
+        self._cond = threading.Condition()
+        self._items: deque = deque()
+        self.maxsize = maxsize
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, item) -> None:
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._items) < self.maxsize or self._closed)
+            if self._closed:
+                return
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Tuple[bool, Any]:
+        """Devuelve (True, item) o (False, None) si la cola se cerró o venció el timeout."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                return False, None
+            if not self._items:
+                return False, None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return True, item
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class StageStats:
+    """Contadores de una etapa: fotogramas procesados, FPS y descartes de su cola."""
+
+    def __init__(self, name: str, queue: Optional[LatestQueue] = None):
+        self.name = name
+        self.queue = queue
+        self.frames = 0
+        self.fps = 0.0
+        self._window_start = time.perf_counter()
+        self._window_frames = 0
+
+    def tick(self) -> None:
+        self.frames += 1
+        self._window_frames += 1
+        now = time.perf_counter()
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self.fps = self._window_frames / elapsed
+            self._window_start, self._window_frames = now, 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "fps": round(self.fps, 1),
+            "dropped": self.queue.dropped if self.queue is not None else 0,
+        }
+
+
+class Pipeline:
+    """Une captura, procesamiento y render con colas de último fotograma.
+
+    Args:
+        read_fn: `read_fn() -> (ok, frame)`, p. ej. `cap.read`
+        process_fn: `process_fn(frame) -> item`; si devuelve None el fotograma se descarta
+        render_fn: `render_fn(item) -> bool`; devolver False detiene el pipeline
+        live: False para fuentes leídas a demanda (video, carpeta): no se descarta
+            ningún fotograma y al terminar la fuente se vacían las colas
+
+    Cualquier etapa puede llamar a `stop()`. `latency_ms` es el retraso
+    captura->render del último fotograma mostrado.
+    """
+
+    def __init__(self, read_fn: Callable[[], Tuple[bool, Any]],
+                 process_fn: Callable[[Any], Any],
+                 render_fn: Callable[[Any], bool], live: bool = True):
+        self.read_fn = read_fn
+        self.process_fn = process_fn
+        self.render_fn = render_fn
+        self.live = live
+        self.captured = LatestQueue() if live else BlockingQueue()
+        self.processed = LatestQueue() if live else BlockingQueue()
+        self.stats = {
+            "capture": StageStats("capture"),
+            "process": StageStats("process", self.captured),
+            "render": StageStats("render", self.processed),
+        }
+        self.latency_ms = 0.0
+        self.error: Optional[BaseException] = None
+        self._stop = threading.Event()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.captured.close()
+        self.processed.close()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def _capture_loop(self) -> None:
+        try:
+            while not self._stop.is_set():
+                ok, frame = self.read_fn()
+                if not ok:
+                    if not self.live:
+                        # Fin del video/carpeta: las otras etapas terminan lo que queda
+                        # y el render detiene el pipeline al recibir _END
+                        self.captured.put(_END)
+                        return
+                    print("No pude leer frame.")
+                    break
+                self.stats["capture"].tick()
+                self.captured.put((time.perf_counter(), frame))
+        except BaseException as e:
+            self.error = e
+        self.stop()
+
+    def _process_loop(self) -> None:
+        try:
+            while not self._stop.is_set():
+                ok, packed = self.captured.get(timeout=0.5)
+                if not ok:
+                    continue
+                if packed is _END:
+                    self.processed.put(_END)
+                    return
+                t_capture, frame = packed
+                item = self.process_fn(frame)
+                self.stats["process"].tick()
+                if item is not None:
+                    self.processed.put((t_capture, item))
+        except BaseException as e:
+            self.error = e
+        self.stop()
+
+    def run(self) -> None:
+        """Arranca captura y procesamiento en hilos y renderiza en el hilo actual."""
+        workers = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._process_loop, name="process", daemon=True),
+        ]
+        for t in workers:
+            t.start()
+        try:
+            while not self._stop.is_set():
+                ok, packed = self.processed.get(timeout=0.5)
+                if not ok:
+                    continue
+                if packed is _END:
+                    break
+                t_capture, item = packed
+                keep_going = self.render_fn(item)
+                self.latency_ms = (time.perf_counter() - t_capture) * 1000.0
+                self.stats["render"].tick()
+                if keep_going is False:
+                    break
+        finally:
+            self.stop()
+            for t in workers:
+                t.join(timeout=2.0)
+        if self.error is not None:
+            raise self.error
+
+    def report(self) -> str:
+        parts = [f"{name}: {d['frames']} frames, {d['fps']:.1f} fps, {d['dropped']} descartados"
+                 for name, d in ((n, s.as_dict()) for n, s in self.stats.items())]
+        return " | ".join(parts) + f" | latencia {self.latency_ms:.0f} ms"
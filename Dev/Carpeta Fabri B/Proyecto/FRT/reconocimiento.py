@@ -1,11 +1,12 @@
+import argparse
 import cv2
 import json
-import sqlite3
+import numpy as np
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Iterator, List, NamedTuple, Tuple, Optional
 
 try:
-    from config import MODEL_PATH, LABELS_PATH, DB_PATH
+    from config import DB_PATH
 except Exception:
     # If the script is executed directly from inside FRT/, the project root
     # may not be on sys.path. Add the project root (parent of the package)
@@ -14,231 +15,303 @@ except Exception:
     proj_root = Path(__file__).resolve().parents[1]
     if str(proj_root) not in sys.path:
         sys.path.insert(0, str(proj_root))
-    from config import MODEL_PATH, LABELS_PATH, DB_PATH
-
-FACE_SIZE = (200, 200)
-THRESHOLD = 60.0
+    from config import DB_PATH
 
+try:
+    from FRT.detector import get_detector
+    from FRT.seguimiento import FaceTracker
+    from FRT.pipeline import Pipeline
+    from FRT.directorio_personas import PersonDirectory
+    from FRT.comparador_lbph import LBPHMatcher
+    from FRT.votacion import DecisionBuffer
+    from FRT.fuentes import Frame, FrameSource, open_source
+    from FRT.versiones_modelo import (LABELS_FILE, META_FILE, MODEL_BIN_FILE, MODEL_FILE,
+                                      ModelWatcher, current_version, model_files)
+except ImportError:
+    from detector import get_detector
+    from seguimiento import FaceTracker
+    from pipeline import Pipeline
+    from directorio_personas import PersonDirectory
+    from comparador_lbph import LBPHMatcher
+    from votacion import DecisionBuffer
+    from fuentes import Frame, FrameSource, open_source
+    from versiones_modelo import (LABELS_FILE, META_FILE, MODEL_BIN_FILE, MODEL_FILE,
+                                  ModelWatcher, current_version, model_files)
 
-def load_model() -> Tuple[cv2.face_BasicFaceRecognizer, dict]:
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
-    recognizer.read(str(MODEL_PATH))
+FACE_SIZE = (200, 200)
+THRESHOLD = 60.0    # Umbral por defecto si el modelo no trae uno calibrado (FRT/calibracion.py)
+DETECT_WIDTH = 320  # Ancho (px) de la copia reducida para detectar; None = resolución completa
+TRACK_FACES = True  # Seguir la cara entre detecciones y reutilizar el veredicto de la pista
+REDETECT_EVERY = 10 # Con TRACK_FACES, fotogramas entre detecciones completas
+SHORTLIST = None    # Personas a revisar tras comparar con prototipos (None = búsqueda exhaustiva)
+MULTI_FACE = True   # Reconocer todas las caras del fotograma (False = solo la más cercana)
+VOTE_WINDOW = 7     # Fotogramas recientes que votan el veredicto de cada pista
+VOTE_MIN = 4        # Votos coincidentes para decidir (1 = decidir con el primer fotograma)
+HOT_RELOAD = True   # Cargar en segundo plano las versiones nuevas del modelo sin reiniciar
+
+
+def _load_labels(files: dict) -> dict:
     label_to_person = {}
-    if Path(LABELS_PATH).exists():
-        label_to_person = json.loads(Path(LABELS_PATH).read_text(encoding='utf-8'))
+    labels_path = Path(files[LABELS_FILE])
+    if labels_path.exists():
+        label_to_person = json.loads(labels_path.read_text(encoding='utf-8'))
         # keys stored as strings in JSON -> convert to int
         label_to_person = {int(k): v for k, v in label_to_person.items()}
-    return recognizer, label_to_person
-
+    return label_to_person
 
-def _person_exists(person_id: str) -> bool:
-    try:
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute("SELECT 1 FROM personas WHERE id = ?", (int(person_id),))
-        row = cur.fetchone()
-        conn.close()
-        return row is not None
-    except Exception:
-        return False
-
-
-def recognize() -> None:
-    recognizer, label_to_person = load_model()
-
-    cap = cv2.VideoCapture(0)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
-
-    if not cap.isOpened():
-        raise RuntimeError("No pude abrir la cámara.")
-
-    print("Reconociendo... (q para salir)")
 
-    while True:
-        ok, frame = cap.read()
-        if not ok:
-            print("No pude leer frame.")
-            break
+def load_model(version: Optional[str] = None) -> Tuple[cv2.face_BasicFaceRecognizer, dict]:
+    """Carga el modelo y labels de `version` (por defecto la vigente, ver FRT/versiones_modelo.py)."""
+    files = model_files(version)
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.read(files[MODEL_FILE])
+    return recognizer, _load_labels(files)
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        # detect face
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-        faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-        if len(faces) > 0:
-            x, y, w, h = max(faces, key=lambda r: r[2] * r[3])
-            face = gray[y:y+h, x:x+w]
-            face_norm = cv2.equalizeHist(cv2.resize(face, FACE_SIZE))
-
-            label, conf = recognizer.predict(face_norm)
-            person_id = label_to_person.get(label)
-            is_auth = (conf < THRESHOLD) and (person_id is not None) and _person_exists(person_id)
-
-            if is_auth:
-                # get name from DB for display
-                try:
-                    conn = sqlite3.connect(DB_PATH)
-                    cur = conn.cursor()
-                    cur.execute("SELECT nombre FROM personas WHERE id = ?", (int(person_id),))
-                    row = cur.fetchone()
-                    conn.close()
-                    display_name = row[0] if row else str(person_id)
-                except Exception:
-                    display_name = str(person_id)
-                auth_status = f"{display_name} (Autorizado)"
-                color = (0, 255, 0)
-            else:
-                auth_status = "No autorizado"
-                color = (0, 0, 255)
 
-            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-            cv2.putText(frame, auth_status, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
-        else:
-            cv2.putText(frame, "No autorizado", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+def load_matcher(version: Optional[str] = None,
+                 shortlist: Optional[int] = SHORTLIST) -> Tuple[LBPHMatcher, dict]:
+    """Comparador y labels de `version` para reconocer.
 
-        cv2.imshow("Reconocimiento Facial", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+    Abre la copia binaria del modelo con un memory map; si la versión no la
+    tiene (modelos anteriores) se lee el YAML de OpenCV.
+    """
+    files = model_files(version)
+    if Path(files[MODEL_BIN_FILE]).exists():
+        return LBPHMatcher.load(files[MODEL_BIN_FILE], shortlist=shortlist), _load_labels(files)
+    recognizer, label_to_person = load_model(version)
+    # Histogramas del modelo en una matriz NumPy: mismas distancias que
+    # recognizer.predict, pero vectorizadas
+    return LBPHMatcher.from_recognizer(recognizer, shortlist=shortlist), label_to_person
 
-    cap.release()
-    cv2.destroyAllWindows()
 
+def load_thresholds(version: Optional[str] = None) -> Tuple[float, Optional[float]]:
+    """Umbral de aceptación y de decisión inmediata guardados por FRT/calibracion.py.
 
-if __name__ == "__main__":
-    recognize()
-import cv2                # Importamos OpenCV, una librería popular para el procesamiento de imágenes y video.
-import json               # Importamos la librería 'json' para leer y escribir datos en formato JSON (en este caso, las etiquetas).
-import time               # Importamos 'time' para trabajar con funciones relacionadas al tiempo (en este caso, no es necesario en este archivo, pero se podría usar para manejar temporizadores).
-from pathlib import Path  # Importamos 'Path' de 'pathlib', que facilita la manipulación de rutas de archivos y directorios.
-
-# Definimos las rutas donde se guardan el modelo entrenado y las etiquetas
-MODEL_PATH = Path("model_lbph.yml")  # Ruta donde se almacenará el modelo entrenado.
-LABELS_PATH = Path("labels.json")    # Ruta donde se guardarán las etiquetas (ID -> nombre).
-FACE_SIZE = (200, 200)               # El tamaño al que se redimensionarán las caras antes de la predicción.
-THRESHOLD = 60.0                     # Umbral de confianza. Si la confianza (error) es menor que este valor, se acepta el rostro.
-
-# Función que carga el modelo entrenado y las etiquetas
-def load_model():
-    # Cargamos el modelo LBPH (Local Binary Pattern Histogram) para el reconocimiento facial.
-    recognizer = cv2.face.LBPHFaceRecognizer_create() 
-    recognizer.read(str(MODEL_PATH))  # Leemos el modelo entrenado desde el archivo 'model_lbph.yml'.
-    
-    # Cargamos las etiquetas (ID -> nombre) desde el archivo 'labels.json'.
-    label_to_name = json.loads(LABELS_PATH.read_text(encoding="utf-8"))
-    
-    # Retornamos el reconocedor (modelo) y el diccionario de etiquetas.
-    return recognizer, label_to_name
-
-# Función para detectar caras en una imagen en escala de grises
-def detect_face(gray):
-    # Cargamos el clasificador Haar previamente entrenado para detectar rostros.
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-    
-    # Detectamos las caras en la imagen usando el clasificador Haar.
-    faces = face_cascade.detectMultiScale(gray, 1.3, 5)
-    
-    # Si no se detecta ninguna cara, retornamos None.
-    if len(faces) == 0:
-        return None
-    
-    # Si se detecta más de una cara, seleccionamos la que tiene mayor área (la más cercana a la cámara).
-    x, y, w, h = max(faces, key=lambda r: r[2] * r[3])
-    
-    # Retornamos la cara recortada y las coordenadas del rectángulo que rodea la cara (x, y, w, h).
-    return gray[y:y+h, x:x+w], (x, y, w, h)
-
-# Función principal para realizar el reconocimiento facial
-def recognize():
-    # Cargamos el modelo entrenado y las etiquetas (ID -> nombre)
-    recognizer, label_to_name = load_model()
-
-    # Abrimos la cámara (índice 0 para la cámara de DroidCam, según lo mencionado)
-    cap = cv2.VideoCapture(0)  # Usamos el índice 0 (cámara de DroidCam)
-    
-    # Establecemos las dimensiones del video de la cámara (1280x720 píxeles o cualquier resolución que prefieras)
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)  # Resolución en el eje X (ancho)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)  # Resolución en el eje Y (alto)
-    
-    # Verificamos si la cámara se ha abierto correctamente, si no, lanzamos un error
-    if not cap.isOpened():
-        raise RuntimeError("No pude abrir la cámara.")  # Si no se puede acceder a la cámara, lanzamos un error.
-
-    print("Reconociendo... (q para salir)")  # Mensaje que informa al usuario que el sistema está listo para reconocer rostros.
-
-    # Variable para saber si la persona está autorizada
-    is_authorized = False  # Inicialmente asumimos que no está autorizado
-
-    # Bucle principal donde capturamos fotogramas de la cámara de forma continua
-    while True:
-        ok, frame = cap.read()  # Leemos un fotograma de la cámara.
-        
-        # Si no se puede leer el fotograma, mostramos un mensaje de error y salimos
-        if not ok:
-            print("No pude leer frame.")
-            break
-
-        # Convertimos el fotograma a escala de grises, ya que el modelo de reconocimiento funciona con imágenes en blanco y negro
+    Sin calibración devuelve (THRESHOLD, None).
+    """
+    try:
+        meta = json.loads(Path(model_files(version)[META_FILE]).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return THRESHOLD, None
+    threshold = meta.get("threshold") or THRESHOLD
+    return float(threshold), meta.get("early_threshold")
+
+
+def recognize_faces(gray, boxes, matcher: LBPHMatcher) -> List[Tuple[Tuple[int, int, int, int], int, float]]:
+    """Reconoce todas las caras `boxes` de `gray` en una sola pasada del comparador.
+
+    Returns:
+        lista de (box, label, distancia) en el mismo orden que `boxes`
+    """
+    if not boxes:
+        return []
+    faces = np.stack([cv2.equalizeHist(cv2.resize(gray[y:y+h, x:x+w], FACE_SIZE))
+                      for (x, y, w, h) in boxes])
+    labels, dists = matcher.predict_batch(faces, k=1)
+    return [(box, int(lab[0]), float(dist[0])) for box, lab, dist in zip(boxes, labels, dists)]
+
+
+class FaceResult(NamedTuple):
+    """Resultado de una cara en un fotograma."""
+    box: Tuple[int, int, int, int]
+    status: str                 # "verificando", "autorizado" o "no_autorizado"
+    person_id: Optional[str]
+    name: Optional[str]
+    distance: Optional[float]
+    decided: bool               # True solo en el fotograma en que se tomó la decisión
+
+
+class LoadedModel(NamedTuple):
+    """Todo lo que el motor necesita de una versión del modelo."""
+    version: Optional[str]      # None = modelo sin versiones (formato anterior)
+    matcher: LBPHMatcher
+    label_to_person: dict
+    threshold: float
+    early_threshold: Optional[float]
+
+
+class RecognitionEngine:
+    """Reconocimiento sin ventanas: detección/seguimiento, votación y veredicto.
+
+    `process(frame)` devuelve la lista de `FaceResult` del fotograma y
+    `run(source)` hace lo mismo para cada fotograma de una fuente
+    (ver FRT/fuentes.py) como generador.
+    Ninguno dibuja ni abre ventanas; para eso está `draw_results`.
+
+    Con `hot_reload` un hilo de fondo carga cada versión nueva del modelo
+    apenas se publica y la reemplaza de una vez: `process` nunca espera la
+    carga y cada fotograma usa una sola versión completa.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, detect_width: Optional[int] = DETECT_WIDTH,
+                 threshold: Optional[float] = None, shortlist: Optional[int] = SHORTLIST,
+                 multi_face: bool = MULTI_FACE, hot_reload: bool = HOT_RELOAD):
+        self.shortlist = shortlist
+        self.detect_width = detect_width
+        self.multi_face = multi_face
+        self._threshold = threshold
+        current = current_version()
+        self.model = self._load(current["version"] if current else None)
+        self.watcher = (ModelWatcher(self._reload, version=self.model.version).start()
+                        if hot_reload else None)
+        # id -> nombre en memoria; se recarga en segundo plano cuando cambia la BD
+        self.people = PersonDirectory(db_path).start()
+        # El tracker se crea en el primer `process`: su detector es el del hilo
+        # que procesa (un detector por hilo, ver FRT/detector.py), que en
+        # `recognize` es el hilo del pipeline y no el que crea el motor
+        self.tracker: Optional[FaceTracker] = None
+
+    def _load(self, version: Optional[str]) -> LoadedModel:
+        matcher, label_to_person = load_matcher(version, self.shortlist)
+        # Sin `threshold` explícito se usa el calibrado del modelo
+        calibrated, early_threshold = load_thresholds(version)
+        threshold = calibrated if self._threshold is None else self._threshold
+        return LoadedModel(version, matcher, label_to_person, threshold, early_threshold)
+
+    def _reload(self, version: str) -> None:
+        # Corre en el hilo del ModelWatcher; el reemplazo es una sola asignación
+        self.model = self._load(version)
+        print(f"[Modelo] Versión {version} cargada")
+
+    def process(self, frame) -> List[FaceResult]:
+        """Procesa un fotograma BGR y devuelve el resultado de cada cara."""
+        model = self.model  # una sola versión para todo el fotograma
+        if self.tracker is None:
+            # Sin TRACK_FACES se detecta en cada fotograma (redetect_every=1)
+            self.tracker = FaceTracker(get_detector(self.detect_width),
+                                       redetect_every=REDETECT_EVERY if TRACK_FACES else 1,
+                                       multi=self.multi_face)
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Llamamos a la función detect_face para detectar si hay alguna cara en la imagen en escala de grises.
-        res = detect_face(gray)
-
-        # Si se detecta una cara, procesamos el resultado.
-        if res is not None:
-            face, (x, y, w, h) = res  # Extraemos la cara y las coordenadas del rectángulo que rodea la cara.
-            
-            # Normalizamos la cara y la redimensionamos al tamaño definido en FACE_SIZE.
-            face_norm = cv2.equalizeHist(cv2.resize(face, FACE_SIZE))
-            
-            # Usamos el modelo entrenado para hacer la predicción y obtener la etiqueta (ID) y la confianza (error).
-            label, conf = recognizer.predict(face_norm)
-            
-            # Obtenemos el nombre de la persona a partir de la etiqueta (ID) usando 'label_to_name'.
-            name = label_to_name.get(str(label), "Desconocido")
-            
-            # Si la confianza es menor que el umbral, se considera que el rostro es reconocido.
-            is_auth = conf < THRESHOLD
-            
-            # Si el rostro es reconocido y autorizado, mostramos el nombre, si no mostramos "No autorizado"
-            if is_auth:
-                auth_status = f"{name} (Autorizado)"
-                color = (0, 255, 0)  # Verde para autorizado
-                is_authorized = True  # La persona está autorizada
-                print(is_authorized)
+        # detect faces (cascade cargado una sola vez; corre sobre la copia reducida
+        # y las cajas vuelven en coordenadas de `gray`, el recorte es a resolución completa).
+        # Entre detecciones las cajas se siguen con matchTemplate.
+        tracks = self.tracker.update(gray)
+
+        # Solo se predicen las pistas sin decidir, todas juntas en un lote; cada
+        # resultado vota en la ventana de su pista. Al decidir la pista deja de
+        # predecirse hasta que se pierda.
+        pending = [t for t in tracks if not t.predicted]
+        results = recognize_faces(gray, [t.box for t in pending], model.matcher)
+        decided_now = set()
+        for track, (_, label, conf) in zip(pending, results):
+            if track.votes is None:
+                track.votes = DecisionBuffer(model.threshold, window=VOTE_WINDOW, min_votes=VOTE_MIN,
+                                             early_threshold=model.early_threshold)
+            decision = track.votes.add(label, conf)
+            if decision is None:
+                continue
+            track.label, track.distance = decision.label, decision.distance
+            track.person_id = model.label_to_person.get(decision.label) if decision.accepted else None
+            track.is_auth = decision.accepted and (track.person_id in self.people)
+            track.name = self.people.get(track.person_id)
+            track.predicted = True
+            decided_now.add(id(track))
+
+        out = []
+        for track in tracks:
+            if not track.predicted:
+                status = "verificando"
             else:
-                auth_status = "No autorizado"
-                color = (0, 0, 255)  # Rojo para no autorizado
-                is_authorized = False  # La persona no está autorizada
-
-            # Dibujamos un rectángulo alrededor de la cara detectada.
-            cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-            
-            # Escribimos el texto (nombre y estado de autorización) sobre la imagen.
-            cv2.putText(frame, auth_status, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
-
+                status = "autorizado" if track.is_auth else "no_autorizado"
+            out.append(FaceResult(track.box, status, track.person_id, track.name,
+                                  track.distance, id(track) in decided_now))
+        return out
+
+    def run(self, source) -> Iterator[Tuple[Frame, List[FaceResult]]]:
+        """Genera (Frame, resultados) por cada fotograma de `source`.
+
+        `source` es una `FrameSource` o cualquier cosa que acepte `open_source`
+        (índice de cámara, video, carpeta de imágenes o URL). Una fuente que
+        abre `run` se libera al terminar, aunque el generador se corte antes;
+        una `FrameSource` recibida la libera quien la creó.
+        """
+        if isinstance(source, FrameSource):
+            for frame in source:
+                yield frame, self.process(frame.image)
+            return
+        with open_source(source) as src:
+            for frame in src:
+                yield frame, self.process(frame.image)
+
+    def close(self) -> None:
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.people.stop()
+
+
+def draw_results(frame, results: List[FaceResult]):
+    """Sink opcional: dibuja los resultados sobre `frame` (in place) y lo devuelve."""
+    for r in results:
+        x, y, w, h = r.box
+        if r.status == "autorizado":
+            text, color = f"{r.name} (Autorizado)", (0, 255, 0)
+        elif r.status == "verificando":
+            text, color = "Verificando...", (0, 255, 255)
         else:
-            # Si no se detecta ninguna cara, mostramos "No autorizado"
-            cv2.putText(frame, "No autorizado", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            is_authorized = False  # La persona no está autorizada si no se detecta cara
-
-        # Mostramos el fotograma con la cara detectada y el nombre en la ventana de OpenCV.
-        cv2.imshow("Reconocimiento Facial", frame)
+            text, color = "No autorizado", (0, 0, 255)
+        cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(frame, text, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, color, 2)
+    if not results:
+        cv2.putText(frame, "No autorizado", (50, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+    return frame
+
+
+def log_decisions(results: List[FaceResult]) -> None:
+    """Imprime una línea por cada decisión tomada en este fotograma."""
+    for r in results:
+        if r.decided:
+            verdict = f"{r.name} autorizado" if r.status == "autorizado" else "no autorizado"
+            print(f"[Decisión] {verdict} (dist={r.distance:.1f})")
+
+
+def recognize(source=0, headless: bool = False) -> None:
+    """Cliente del motor sobre `source` (cámara por defecto; ver `open_source`).
+
+    Con `headless=True` no abre ventanas y solo imprime las decisiones.
+    """
+    cap = open_source(source)
+    engine = RecognitionEngine()
+
+    if headless:
+        print("Reconociendo sin ventana... (Ctrl+C para salir)")
+        try:
+            for _, results in engine.run(cap):
+                log_decisions(results)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            engine.close()
+            cap.release()
+        return
+
+    # Etapa de procesamiento (hilo propio): el motor; no toca ventanas
+    def process(frame):
+        results = engine.process(frame)
+        log_decisions(results)
+        return frame, results
+
+    # Etapa de render (hilo principal): dibujar y mostrar
+    def render(item) -> bool:
+        frame, results = item
+        cv2.imshow("Reconocimiento Facial", draw_results(frame, results))
+        return not (cv2.waitKey(1) & 0xFF == ord('q'))
 
-        # Si se presiona la tecla 'q', salimos del bucle de reconocimiento
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-        # Aquí es donde puedes enviar la variable `is_authorized` al microcontrolador
-        # Por ejemplo, si estás usando un puerto serial, podrías hacer algo como:
-        # if is_authorized:
-        #     serial_port.write(b'1')  # Mandar señal para abrir la puerta
-        # else:
-        #     serial_port.write(b'0')  # Mandar señal para no abrir la puerta
+    print("Reconociendo... (q para salir)")
+    pipeline = Pipeline(cap.read, process, render, live=cap.live)
+    try:
+        pipeline.run()
+    finally:
+        engine.close()
+        cap.release()
+        cv2.destroyAllWindows()
+        print(f"[Pipeline] {pipeline.report()}")
 
-    # Liberamos la cámara y cerramos todas las ventanas de OpenCV al finalizar.
-    cap.release()
-    cv2.destroyAllWindows()
 
-# Punto de entrada del código: cuando se ejecuta el archivo.
 if __name__ == "__main__":
-    recognize()  # Llamamos a la función de reconocimiento facial para iniciar el proceso.
+    parser = argparse.ArgumentParser(description="Reconocimiento facial con la cámara local")
+    parser.add_argument("--source", default="0",
+                        help="índice de cámara, video, carpeta de imágenes o URL (por defecto 0)")
+    parser.add_argument("--headless", action="store_true",
+                        help="no abrir ventanas; solo imprimir las decisiones")
+    args = parser.parse_args()
+    recognize(args.source, headless=args.headless)
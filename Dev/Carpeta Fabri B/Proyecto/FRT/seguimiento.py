@@ -0,0 +1,128 @@
+"""Seguimiento barato de la cara entre detecciones.
+
+Entre dos detecciones Haar la caja se sigue con `cv2.matchTemplate` sobre una
+ventana reducida alrededor de la última posición. La identidad calculada para
+una pista (label, distancia, persona) se reutiliza mientras la pista viva, así
+`recognizer.predict` solo corre hasta que la pista queda decidida y no en
+cada fotograma.
+"""
+from typing import List, Optional, Tuple
+
+import cv2
+
+REDETECT_EVERY = 10     # Fotogramas entre detecciones completas
+TRACK_MIN_SCORE = 0.6   # Correlación mínima para seguir confiando en la pista
+TRACK_IOU = 0.3         # Solapamiento mínimo para que una detección continúe la pista
+TEMPLATE_SIZE = 48      # Lado (px) de la plantilla reducida usada para seguir
+SEARCH_MARGIN = 0.5     # Margen de búsqueda alrededor de la caja (fracción del lado)
+
+Box = Tuple[int, int, int, int]
+
+
+def iou(a: Box, b: Box) -> float:
+    """Intersección sobre unión de dos cajas (x, y, w, h)."""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FaceTrack:
+    """Una cara seguida entre fotogramas junto con su veredicto de identidad."""
+
+    def __init__(self, gray, box: Box):
+        self.label: Optional[int] = None
+        self.distance: Optional[float] = None
+        self.person_id: Optional[str] = None
+        self.name: Optional[str] = None
+        self.is_auth = False
+        self.predicted = False
+        self.votes = None  # ventana de votación que asigna el reconocedor
+        self.reset(gray, box)
+
+    def reset(self, gray, box: Box) -> None:
+        """Reancla la pista a una detección nueva (conserva la identidad)."""
+        x, y, w, h = box
+        self.box = box
+        self.score = 1.0
+        self.frames_since_detect = 0
+        self.scale = min(1.0, TEMPLATE_SIZE / float(max(w, h)))
+        self.template = cv2.resize(gray[y:y+h, x:x+w], None, fx=self.scale, fy=self.scale,
+                                   interpolation=cv2.INTER_AREA)
+
+    def update(self, gray) -> float:
+        """Sigue la caja en `gray` y devuelve la correlación del ajuste (0..1)."""
+        self.frames_since_detect += 1
+        x, y, w, h = self.box
+        mx, my = int(w * SEARCH_MARGIN), int(h * SEARCH_MARGIN)
+        x0, y0 = max(0, x - mx), max(0, y - my)
+        x1, y1 = min(gray.shape[1], x + w + mx), min(gray.shape[0], y + h + my)
+        window = cv2.resize(gray[y0:y1, x0:x1], None, fx=self.scale, fy=self.scale,
+                            interpolation=cv2.INTER_AREA)
+        th, tw = self.template.shape[:2]
+        if window.shape[0] < th or window.shape[1] < tw:
+            self.score = 0.0
+            return self.score
+
+        res = cv2.matchTemplate(window, self.template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, (px, py) = cv2.minMaxLoc(res)
+        self.box = (x0 + int(round(px / self.scale)), y0 + int(round(py / self.scale)), w, h)
+        self.score = float(max_val)
+        return self.score
+
+
+class FaceTracker:
+    """Decide cuándo detectar y cuándo solo seguir las caras.
+
+    Detecta cada `redetect_every` fotogramas o cuando la correlación de alguna
+    pista cae por debajo de `min_score`. Una pista con correlación baja se da
+    por perdida (puede ser otra persona en el mismo lugar): la detección que
+    caiga ahí empieza una pista nueva y se vuelve a verificar. En la detección
+    programada, cada detección continúa la pista sana con la que más solapa
+    (conservando su identidad); las que no solapan con ninguna empiezan una
+    pista nueva y las pistas sin detección se pierden.
+    Con `multi=False` solo se sigue la cara más cercana.
+    """
+
+    def __init__(self, detector, redetect_every: int = REDETECT_EVERY,
+                 min_score: float = TRACK_MIN_SCORE, multi: bool = False):
+        self.detector = detector
+        self.redetect_every = redetect_every
+        self.min_score = min_score
+        self.multi = multi
+        self.tracks: List[FaceTrack] = []
+
+    def update(self, gray) -> List[FaceTrack]:
+        """Procesa un fotograma en gris y devuelve las pistas vigentes."""
+        if self.tracks and all(t.frames_since_detect + 1 < self.redetect_every for t in self.tracks):
+            scores = [t.update(gray) for t in self.tracks]
+            if min(scores) >= self.min_score:
+                return self.tracks
+            # Las pistas que perdieron la cara no conservan su identidad
+            self.tracks = [t for t, score in zip(self.tracks, scores) if score >= self.min_score]
+
+        if self.multi:
+            boxes = self.detector.detect(gray)
+        else:
+            largest = self.detector.detect_largest(gray)
+            boxes = [largest] if largest is not None else []
+
+        # Asignación voraz por IoU: primero los pares que más solapan
+        pairs = sorted(((iou(t.box, b), ti, bi) for ti, t in enumerate(self.tracks)
+                        for bi, b in enumerate(boxes)), reverse=True)
+        used_tracks, used_boxes, tracks = set(), set(), []
+        for overlap, ti, bi in pairs:
+            if overlap < TRACK_IOU:
+                break
+            if ti in used_tracks or bi in used_boxes:
+                continue
+            used_tracks.add(ti)
+            used_boxes.add(bi)
+            self.tracks[ti].reset(gray, boxes[bi])
+            tracks.append(self.tracks[ti])
+        tracks.extend(FaceTrack(gray, b) for bi, b in enumerate(boxes) if bi not in used_boxes)
+        self.tracks = tracks
+        return self.tracks
@@ -0,0 +1,172 @@
+"""Versiones del modelo con publicación atómica y recarga en caliente.
+
+Cada publicación escribe sus archivos en una carpeta temporal dentro de
+MODEL_VERSIONS_DIR, la renombra a `versions/<versión>` y recién entonces
+reemplaza MODEL_CURRENT_PATH (con `os.replace`, atómico) para apuntar a ella.
+Un lector siempre ve una versión completa: la anterior o la nueva, nunca un
+archivo a medio escribir. Se conservan las últimas KEEP_VERSIONS versiones
+para que un lector que empezó con la anterior pueda terminar de leerla.
+
+Si no hay current.json se usan las rutas sin versión de config.py (el
+formato anterior), así un modelo ya entrenado sigue funcionando.
+"""
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from config import (MODEL_VERSIONS_DIR, MODEL_CURRENT_PATH, MODEL_PATH, MODEL_BIN_PATH,
+                    LABELS_PATH, TRAIN_MANIFEST_PATH, MODEL_META_PATH)
+
+KEEP_VERSIONS = 3     # Versiones que se conservan en disco
+POLL_INTERVAL = 2.0   # Segundos entre comprobaciones de una versión nueva
+
+# Nombre de cada artefacto dentro de la carpeta de una versión
+MODEL_FILE = os.path.basename(MODEL_PATH)
+MODEL_BIN_FILE = os.path.basename(MODEL_BIN_PATH)
+LABELS_FILE = os.path.basename(LABELS_PATH)
+TRAIN_MANIFEST_FILE = os.path.basename(TRAIN_MANIFEST_PATH)
+META_FILE = os.path.basename(MODEL_META_PATH)
+
+LEGACY_FILES = {
+    MODEL_FILE: MODEL_PATH,
+    MODEL_BIN_FILE: MODEL_BIN_PATH,
+    LABELS_FILE: LABELS_PATH,
+    TRAIN_MANIFEST_FILE: TRAIN_MANIFEST_PATH,
+    META_FILE: MODEL_META_PATH,
+}
+
+
+def current_version() -> Optional[dict]:
+    """Contenido de current.json ({"version", "created"}) o None si no hay versiones."""
+    try:
+        return json.loads(Path(MODEL_CURRENT_PATH).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def model_files(version: Optional[str] = None) -> Dict[str, str]:
+    """Rutas de los artefactos de `version` (por defecto la vigente).
+
+    Devuelve {nombre de archivo: ruta} con las claves MODEL_FILE, MODEL_BIN_FILE,
+    LABELS_FILE, TRAIN_MANIFEST_FILE y META_FILE (las rutas pueden no existir todavía).
+    """
+    if version is None:
+        current = current_version()
+        if current is None:
+            return dict(LEGACY_FILES)
+        version = current["version"]
+    vdir = os.path.join(MODEL_VERSIONS_DIR, version)
+    return {name: os.path.join(vdir, name) for name in LEGACY_FILES}
+
+
+def _new_version_name() -> str:
+    return datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+
+
+def _carry(src: str, dst: str) -> None:
+    """Copia un artefacto de la versión anterior (enlace duro si se puede)."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+@contextmanager
+def publish_version(inherit: Iterable[str] = ()) -> Iterator[str]:
+    """Abre una carpeta temporal para escribir una versión nueva y la publica al salir.
+
+    Args:
+        inherit: nombres de archivo que se toman de la versión vigente sin
+            cambios (p. ej. META_FILE al reentrenar). No hay que escribir
+            encima de ellos: se comparten por enlace duro.
+
+    Si el bloque lanza una excepción, la carpeta temporal se borra y la
+    versión vigente no cambia.
+    """
+    os.makedirs(MODEL_VERSIONS_DIR, exist_ok=True)
+    version = _new_version_name()
+    tmp_dir = os.path.join(MODEL_VERSIONS_DIR, f".tmp-{version}")
+    os.makedirs(tmp_dir)
+    try:
+        previous = model_files()
+        for name in inherit:
+            if os.path.exists(previous[name]):
+                _carry(previous[name], os.path.join(tmp_dir, name))
+        yield tmp_dir
+        os.rename(tmp_dir, os.path.join(MODEL_VERSIONS_DIR, version))
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    tmp_current = MODEL_CURRENT_PATH + ".tmp"
+    with open(tmp_current, 'w', encoding='utf-8') as fh:
+        json.dump({"version": version, "created": datetime.now().isoformat(timespec="seconds")}, fh)
+    os.replace(tmp_current, MODEL_CURRENT_PATH)
+    print(f"[OK] Versión del modelo publicada: {version}")
+    prune_versions()
+
+
+def prune_versions(keep: int = KEEP_VERSIONS) -> None:
+    """Borra las versiones más viejas, salvo la vigente."""
+    root = Path(MODEL_VERSIONS_DIR)
+    if not root.exists():
+        return
+    current = (current_version() or {}).get("version")
+    versions = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in versions[:-keep] if keep > 0 else versions:
+        if old.name != current:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+_UNSET = object()
+
+
+class ModelWatcher:
+    """Hilo que avisa con `on_change(version)` cuando current.json apunta a otra versión.
+
+    `version` es la versión que ya cargó quien lo crea (None = formato sin
+    versiones). Hay que pasarla: si el watcher leyera current.json por su
+    cuenta, una versión publicada entre las dos lecturas nunca se cargaría.
+    """
+
+    def __init__(self, on_change: Callable[[str], None], poll_interval: float = POLL_INTERVAL,
+                 version=_UNSET):
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        if version is _UNSET:
+            current = current_version()
+            version = current["version"] if current else None
+        self.version: Optional[str] = version
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ModelWatcher":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1.0)
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            current = current_version()
+            if current is None or current["version"] == self.version:
+                continue
+            try:
+                self.on_change(current["version"])
+            except Exception as e:
+                # Se reintenta en la próxima vuelta (p. ej. versión borrada a mitad de lectura)
+                print(f"No pude cargar la versión {current['version']} del modelo: {e}")
+                continue
+            self.version = current["version"]
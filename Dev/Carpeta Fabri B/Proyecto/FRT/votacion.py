@@ -0,0 +1,80 @@
+"""Votación temporal del veredicto de una pista.
+
+En vez de autorizar o negar con un solo `predict`, cada pista junta los
+(label, distancia) de sus últimos fotogramas en una ventana deslizante y
+decide por mayoría. Apenas una persona junta `min_votes` votos por debajo del
+umbral (o los rechazos llegan a `min_votes`) la pista queda decidida: se emite
+un único evento y no se vuelve a predecir hasta que la pista se pierda.
+Con un umbral calibrado estricto (`early_threshold`) una sola distancia por
+debajo alcanza para aceptar en el primer fotograma.
+"""
+from collections import Counter, deque
+from typing import NamedTuple, Optional
+
+VOTE_WINDOW = 7       # Fotogramas recientes que cuentan para la votación
+VOTE_MIN = 4          # Votos coincidentes para decidir (autorizar o rechazar)
+VOTE_MAX_FRAMES = 20  # Fotogramas como máximo antes de forzar un rechazo
+
+
+class Decision(NamedTuple):
+    """Veredicto final de una pista."""
+    label: Optional[int]   # label ganador (None si se rechazó)
+    distance: float        # distancia media de los votos ganadores
+    accepted: bool         # True si el label ganador quedó por debajo del umbral
+    frames: int            # fotogramas que hicieron falta para decidir
+
+
+class DecisionBuffer:
+    """Ventana de (label, distancia) de una pista con decisión por mayoría.
+
+    Un voto es de aceptación para `label` si `distancia < threshold` y de
+    rechazo si no. Se decide en cuanto un mismo label junta `min_votes` votos de
+    aceptación dentro de la ventana, o cuando los rechazos llegan a `min_votes`.
+    Si a los `max_frames` fotogramas no hubo mayoría, se rechaza. Una distancia
+    menor que `early_threshold` acepta de inmediato.
+    """
+
+    def __init__(self, threshold: float, window: int = VOTE_WINDOW,
+                 min_votes: int = VOTE_MIN, max_frames: int = VOTE_MAX_FRAMES,
+                 early_threshold: Optional[float] = None):
+        self.threshold = threshold
+        self.early_threshold = early_threshold
+        self.min_votes = min_votes
+        self.max_frames = max_frames
+        self.samples = deque(maxlen=window)
+        self.frames = 0
+        self.decision: Optional[Decision] = None
+
+    @property
+    def decided(self) -> bool:
+        return self.decision is not None
+
+    def add(self, label: int, distance: float) -> Optional[Decision]:
+        """Agrega el resultado de un fotograma.
+
+        Devuelve la decisión solo en el fotograma en que se toma (el evento);
+        antes y después devuelve None.
+        """
+        if self.decision is not None:
+            return None
+        self.frames += 1
+        self.samples.append((label, distance))
+
+        if self.early_threshold is not None and distance < min(self.early_threshold, self.threshold):
+            self.decision = Decision(label, distance, True, self.frames)
+            return self.decision
+
+        votes = Counter(lab for lab, dist in self.samples if dist < self.threshold)
+        rejected = sum(1 for _, dist in self.samples if dist >= self.threshold)
+        if votes:
+            best, count = votes.most_common(1)[0]
+            if count >= self.min_votes:
+                dists = [dist for lab, dist in self.samples if lab == best and dist < self.threshold]
+                self.decision = Decision(best, sum(dists) / len(dists), True, self.frames)
+                return self.decision
+
+        if rejected >= self.min_votes or self.frames >= self.max_frames:
+            dists = [dist for _, dist in self.samples]
+            self.decision = Decision(None, sum(dists) / len(dists), False, self.frames)
+            return self.decision
+        return None
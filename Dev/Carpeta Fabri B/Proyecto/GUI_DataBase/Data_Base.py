@@ -1,9 +1,554 @@
 import sqlite3
 import os
+import re
+import sys
+import threading
+import unicodedata
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    from config import DB_PATH
+except ImportError:
+    # Ejecutado desde GUI_DataBase/: agregar la raíz del proyecto para importar `config`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+    from config import DB_PATH
+
+# Ruta centralizada en config.py
+BASE_DIR = os.path.dirname(DB_PATH)
+
+# WAL deja leer mientras otro escribe (GUI y reconocedor a la vez). Queda
+# guardado en el archivo, así que se activa una sola vez desde
+# crear_base_de_datos y no al abrir cada conexión: un lector (el reconocedor)
+# no debe modificar el archivo de la BD.
+SQL_WAL = "PRAGMA journal_mode = WAL"
+# Pragmas de cada conexión (no se guardan en el archivo); synchronous=NORMAL
+# es seguro con WAL y más rápido.
+PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -8000",
+    "PRAGMA mmap_size = 67108864",
+)
+CACHED_STATEMENTS = 128   # Sentencias preparadas que guarda cada conexión
+
+# Todas las consultas son constantes con parámetros `?`: sqlite3 las prepara
+# una vez por conexión y las reutiliza desde su caché de sentencias.
+# Columnas que devuelven las consultas (nombre_norm es interna)
+COLUMNAS = "id, nombre, cedula, ultima_hora_ingreso, cargo"
+SQL_LISTAR = f"SELECT {COLUMNAS} FROM personas"
+SQL_NOMBRES = "SELECT id, nombre FROM personas"
+# Mayor id en uso: de una persona o de una reserva
+SQL_MAX_ID = '''SELECT MAX(COALESCE((SELECT MAX(id) FROM personas), 0),
+                         COALESCE((SELECT MAX(id) FROM ids_reservados), 0))'''
+# Primer id libre: el menor hueco registrado o el siguiente al máximo. Los
+# MIN/MAX van sobre claves primarias, así que cuesta O(log n) sin recorrer la tabla.
+SQL_ID_LIBRE = f'''SELECT MIN(id) FROM (SELECT MIN(id) AS id FROM ids_libres
+                                    UNION ALL SELECT ({SQL_MAX_ID}) + 1)'''
+SQL_LIBERAR_ID = "INSERT OR IGNORE INTO ids_libres (id) VALUES (?)"
+# Reservas: un id apartado antes de enrolar (ver PersonasRepository.reservar_id)
+SQL_RESERVAR = "INSERT INTO ids_reservados (id, creado) VALUES (?, datetime('now'))"
+SQL_OCUPAR_LIBRE = "DELETE FROM ids_libres WHERE id = ?"
+SQL_ES_RESERVA = "SELECT 1 FROM ids_reservados WHERE id = ?"
+SQL_QUITAR_RESERVA = "DELETE FROM ids_reservados WHERE id = ?"
+SQL_RESERVAS_VENCIDAS = "SELECT id FROM ids_reservados WHERE creado < datetime('now', ?)"
+SQL_EXISTE_PERSONA = "SELECT 1 FROM personas WHERE id = ?"
+RESERVA_VENCE_HORAS = 24   # Una reserva más vieja es de un alta que no terminó (p. ej. se cerró la GUI)
+SQL_INSERTAR = '''INSERT INTO personas (id, nombre, nombre_norm, cedula, ultima_hora_ingreso, cargo)
+                  VALUES (?, ?, ?, ?, ?, ?)'''
+# Una sola sentencia para editar: los campos en NULL conservan su valor
+SQL_EDITAR = '''UPDATE personas SET nombre = COALESCE(?, nombre),
+                                    nombre_norm = COALESCE(?, nombre_norm),
+                                    cedula = COALESCE(?, cedula),
+                                    ultima_hora_ingreso = COALESCE(?, ultima_hora_ingreso),
+                                    cargo = COALESCE(?, cargo)
+                WHERE id = ?'''
+SQL_ELIMINAR = "DELETE FROM personas WHERE id = ?"
+SQL_BUSCAR = f"SELECT {COLUMNAS} FROM personas WHERE nombre LIKE ? OR cedula LIKE ? OR cargo LIKE ? LIMIT ? OFFSET ?"
+SQL_BUSCAR_CEDULA = f"SELECT {COLUMNAS} FROM personas WHERE cedula = ?"
+# Búsqueda en el índice de texto completo, ordenada por relevancia (bm25: menor es mejor).
+# Pesos por columna: nombre, cédula, cargo.
+SQL_BUSCAR_FTS = '''SELECT p.id, p.nombre, p.cedula, p.ultima_hora_ingreso, p.cargo
+                    FROM personas_fts f JOIN personas p ON p.id = f.rowid
+                    WHERE personas_fts MATCH ?
+                    ORDER BY bm25(personas_fts, 10.0, 5.0, 1.0), p.id
+                    LIMIT ? OFFSET ?'''
+SQL_EXISTE = "SELECT id FROM personas WHERE (nombre_norm = ? OR cedula = ?) AND id != ?"
+
+# Tabla de ids libres (huecos que dejaron las eliminaciones) mantenida por
+# triggers: al borrar una persona su id entra en la tabla y al insertar sale.
+SQL_ESQUEMA_IDS_LIBRES = (
+    "CREATE TABLE IF NOT EXISTS ids_libres (id INTEGER PRIMARY KEY)",
+    "CREATE TABLE IF NOT EXISTS ids_reservados (id INTEGER PRIMARY KEY, creado TEXT NOT NULL)",
+    '''CREATE TRIGGER IF NOT EXISTS personas_ocupa_id AFTER INSERT ON personas BEGIN
+           DELETE FROM ids_libres WHERE id = new.id;
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS personas_libera_id AFTER DELETE ON personas BEGIN
+           INSERT OR IGNORE INTO ids_libres (id) VALUES (old.id);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS personas_cambia_id AFTER UPDATE OF id ON personas
+       WHEN old.id != new.id BEGIN
+           DELETE FROM ids_libres WHERE id = new.id;
+           INSERT OR IGNORE INTO ids_libres (id) VALUES (old.id);
+       END''',
+)
+# Índice de texto completo sobre nombre, cédula y cargo. Toma el contenido de
+# `personas` (no lo duplica) y lo mantienen los triggers. unicode61 con
+# remove_diacritics 2 hace que "jose" encuentre "José" y al revés.
+SQL_ESQUEMA_FTS = (
+    '''CREATE VIRTUAL TABLE IF NOT EXISTS personas_fts USING fts5(
+           nombre, cedula, cargo, content='personas', content_rowid='id',
+           tokenize='unicode61 remove_diacritics 2')''',
+    '''CREATE TRIGGER IF NOT EXISTS personas_fts_insertar AFTER INSERT ON personas BEGIN
+           INSERT INTO personas_fts (rowid, nombre, cedula, cargo)
+           VALUES (new.id, new.nombre, new.cedula, new.cargo);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS personas_fts_eliminar AFTER DELETE ON personas BEGIN
+           INSERT INTO personas_fts (personas_fts, rowid, nombre, cedula, cargo)
+           VALUES ('delete', old.id, old.nombre, old.cedula, old.cargo);
+       END''',
+    '''CREATE TRIGGER IF NOT EXISTS personas_fts_editar AFTER UPDATE OF id, nombre, cedula, cargo
+       ON personas BEGIN
+           INSERT INTO personas_fts (personas_fts, rowid, nombre, cedula, cargo)
+           VALUES ('delete', old.id, old.nombre, old.cedula, old.cargo);
+           INSERT INTO personas_fts (rowid, nombre, cedula, cargo)
+           VALUES (new.id, new.nombre, new.cedula, new.cargo);
+       END''',
+)
+SQL_FTS_RECONSTRUIR = "INSERT INTO personas_fts (personas_fts) VALUES ('rebuild')"
+SQL_EXISTE_TABLA = "SELECT 1 FROM sqlite_master WHERE name = ?"
+
+# Reglas de duplicados como restricciones: índices únicos sobre la cédula y
+# sobre el nombre normalizado (ver normalizar_nombre). Las cédulas vacías se
+# guardan como NULL, que no choca con nada. persona_existe, la importación por
+# lotes y los INSERT/UPDATE resuelven los duplicados con estos índices.
+# Si un índice no se pudo crear (duplicados viejos), los INSERT/UPDATE
+# comprueban esa columna con SQL_DUPLICADO_COLUMNA en su misma transacción.
+SQL_COLUMNAS_PERSONAS = "PRAGMA table_info(personas)"
+SQL_AGREGAR_NOMBRE_NORM = "ALTER TABLE personas ADD COLUMN nombre_norm TEXT"
+SQL_SIN_NORMALIZAR = "SELECT id, nombre FROM personas WHERE nombre_norm IS NULL AND nombre IS NOT NULL"
+SQL_NORMALIZAR = "UPDATE personas SET nombre_norm = ? WHERE id = ?"
+SQL_CEDULAS_VACIAS = "UPDATE personas SET cedula = NULL WHERE TRIM(cedula) = ''"
+INDICES_UNICOS = (
+    ("personas_cedula_unica", "cedula", "personas_cedula"),
+    ("personas_nombre_norm_unico", "nombre_norm", "personas_nombre_norm"),
+)
+CAMPOS_UNICOS = {"cedula": "cedula", "nombre_norm": "nombre"}
+# Un valor que no cambia no cuenta (los duplicados viejos se pueden seguir editando)
+SQL_DUPLICADO_COLUMNA = '''SELECT 1 FROM personas WHERE {col} = :valor AND id != :id
+                           AND :valor IS NOT (SELECT {col} FROM personas WHERE id = :id) LIMIT 1'''
+SQL_DUPLICADOS_COLUMNA = '''SELECT {col}, GROUP_CONCAT(id) FROM personas
+                             WHERE {col} IS NOT NULL GROUP BY {col} HAVING COUNT(*) > 1'''
+
+# Importación por lotes: las filas se cargan en una tabla temporal y los
+# duplicados (contra la base y dentro del mismo archivo) se marcan con una
+# sola consulta, con las mismas reglas que persona_existe.
+SQL_LOTE_CREAR = '''CREATE TEMP TABLE IF NOT EXISTS lote_importacion (
+                         fila INTEGER PRIMARY KEY, nombre_norm TEXT, cedula TEXT)'''
+SQL_LOTE_INDICES = (
+    "CREATE INDEX IF NOT EXISTS temp.lote_nombre ON lote_importacion (nombre_norm)",
+    "CREATE INDEX IF NOT EXISTS temp.lote_cedula ON lote_importacion (cedula)",
+)
+SQL_LOTE_CARGAR = "INSERT INTO lote_importacion (fila, nombre_norm, cedula) VALUES (?, ?, ?)"
+SQL_LOTE_DUPLICADOS = '''
+    SELECT l.fila FROM lote_importacion l
+    WHERE EXISTS (SELECT 1 FROM personas p WHERE p.nombre_norm = l.nombre_norm)
+       OR EXISTS (SELECT 1 FROM personas p WHERE p.cedula = l.cedula)
+       OR EXISTS (SELECT 1 FROM lote_importacion o WHERE o.nombre_norm = l.nombre_norm AND o.fila < l.fila)
+       OR EXISTS (SELECT 1 FROM lote_importacion o WHERE o.cedula = l.cedula AND o.fila < l.fila)'''
+SQL_LOTE_BORRAR = "DELETE FROM lote_importacion"
+SQL_IDS_LIBRES = "SELECT id FROM ids_libres ORDER BY id LIMIT ?"
+
+# Reconstruye los huecos a partir de los ids existentes (una vez, al crear la tabla)
+SQL_RECONSTRUIR_IDS_LIBRES = '''
+    WITH RECURSIVE huecos(id, hasta) AS (
+        SELECT 1, (SELECT MIN(id) FROM personas) - 1 WHERE (SELECT MIN(id) FROM personas) > 1
+        UNION ALL
+        SELECT p.id + 1, (SELECT MIN(q.id) FROM personas q WHERE q.id > p.id) - 1
+        FROM personas p
+        WHERE p.id < (SELECT MAX(id) FROM personas)
+          AND NOT EXISTS (SELECT 1 FROM personas q WHERE q.id = p.id + 1)
+        UNION ALL
+        SELECT id + 1, hasta FROM huecos WHERE id < hasta
+    )
+    INSERT OR IGNORE INTO ids_libres (id) SELECT id FROM huecos'''
+
+
+def normalizar_nombre(nombre):
+    """Forma canónica de un nombre para detectar duplicados: sin acentos, sin
+    distinguir mayúsculas y con los espacios colapsados ("  José  PÉREZ" -> "jose perez").
+    Devuelve None para un nombre vacío."""
+    texto = unicodedata.normalize("NFKD", nombre or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(texto.casefold().split()) or None
+
+
+def _cedula(cedula):
+    # Las cédulas vacías se guardan como NULL (no cuentan como duplicadas)
+    return (cedula or "").strip() or None
+
+
+class PersonaDuplicada(ValueError):
+    """Otra persona ya tiene el mismo nombre (normalizado) o la misma cédula."""
+
+    def __init__(self, campo):
+        que = {"cedula": "esa cédula", "nombre": "ese nombre", "id": "ese id"}[campo]
+        super().__init__(f"Ya existe una persona con {que}.")
+        self.campo = campo
+
+
+def _duplicada(error):
+    """Traduce la violación de un índice único de `personas` a PersonaDuplicada."""
+    mensaje = str(error)
+    if "personas.cedula" in mensaje:
+        return PersonaDuplicada("cedula")
+    if "personas.nombre_norm" in mensaje:
+        return PersonaDuplicada("nombre")
+    if "personas.id" in mensaje:
+        return PersonaDuplicada("id")
+    return error
+
+
+class PersonasRepository:
+    """Acceso a la tabla `personas` con conexiones largas, una por hilo.
+
+    Cada hilo que usa el repositorio abre su conexión la primera vez y la
+    reutiliza después (los objetos `sqlite3.Connection` no se comparten entre
+    hilos). Cada operación lógica corre en una única transacción.
+    Lo comparten la GUI y el reconocedor (FRT/directorio_personas.py).
+    """
+
+    def __init__(self, db_path=DB_PATH, timeout=5.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []   # (hilo dueño, conexión)
+
+    def _cerrar_huerfanas(self):
+        # Conexiones de hilos que ya terminaron (p. ej. el hilo de cada alta en la GUI)
+        with self._lock:
+            huerfanas = [c for t, c in self._connections if not t.is_alive()]
+            self._connections = [(t, c) for t, c in self._connections if t.is_alive()]
+        for conn in huerfanas:
+            conn.close()
+
+    def connection(self):
+        """Conexión del hilo actual (se abre y configura la primera vez).
+
+        Al abrir una se cierran las de hilos que ya terminaron; un hilo de vida
+        corta puede además liberar la suya al final con `reconnect()`.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self._cerrar_huerfanas()
+            # isolation_level=None: las transacciones se abren explícitamente en `transaction`
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+            for pragma in PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append((threading.current_thread(), conn))
+        return conn
+
+    @contextmanager
+    def transaction(self, write=False):
+        """Una transacción sobre la conexión del hilo; `write=True` toma el lock de escritura al empezar."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def reconnect(self):
+        """Cierra la conexión del hilo actual; la próxima operación abre una nueva
+        (p. ej. si el archivo de la BD se reemplazó)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            with self._lock:
+                self._connections = [(t, c) for t, c in self._connections if c is not conn]
+            conn.close()
 
-# Ruta centralizada: cámbiala cuando muevas el proyecto
-BASE_DIR = r"C:\Users\favri\Documents\Fabrizzio Bianchini\Facultad\Mecatronica\LPV\Proyecto\GUI_DataBase"
-DB_PATH = os.path.join(BASE_DIR, 'personas.db')
+    def close(self):
+        """Cierra las conexiones de todos los hilos (al terminar el programa)."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for _, conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def activar_wal(self):
+        """Pasa el archivo de la BD a modo WAL (persistente; fuera de una transacción)."""
+        self.connection().execute(SQL_WAL)
+
+    def data_version(self):
+        """`PRAGMA data_version` de la conexión del hilo: cambia cuando otra conexión hace commit."""
+        return self.connection().execute("PRAGMA data_version").fetchone()[0]
+
+    def listar(self):
+        with self.transaction() as conn:
+            return conn.execute(SQL_LISTAR).fetchall()
+
+    def nombres(self):
+        """Diccionario {id (str): nombre} para el reconocedor."""
+        with self.transaction() as conn:
+            return {str(pid): nombre if nombre else str(pid)
+                    for pid, nombre in conn.execute(SQL_NOMBRES)}
+
+    @staticmethod
+    def _asegurar_unicidad(conn):
+        # Migración: columna nombre_norm, cédulas vacías como NULL e índices únicos
+        if "nombre_norm" not in {fila[1] for fila in conn.execute(SQL_COLUMNAS_PERSONAS)}:
+            conn.execute(SQL_AGREGAR_NOMBRE_NORM)
+        conn.executemany(SQL_NORMALIZAR, ((normalizar_nombre(nombre), pid)
+                                          for pid, nombre in conn.execute(SQL_SIN_NORMALIZAR).fetchall()))
+        conn.execute(SQL_CEDULAS_VACIAS)
+        for indice, columna, respaldo in INDICES_UNICOS:
+            try:
+                conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {indice} ON personas ({columna})")
+                conn.execute(f"DROP INDEX IF EXISTS {respaldo}")
+            except sqlite3.IntegrityError:
+                # Hay duplicados cargados de antes: se avisa y se indexa sin unicidad
+                # hasta que se corrijan. Mientras tanto _verificar_duplicados
+                # rechaza los duplicados nuevos en cada INSERT/UPDATE.
+                repetidos = conn.execute(SQL_DUPLICADOS_COLUMNA.format(col=columna)).fetchall()
+                print(f"No se pudo crear el índice único sobre {columna}; repetidos: "
+                      + "; ".join(f"{valor} (ids {ids})" for valor, ids in repetidos))
+                conn.execute(f"CREATE INDEX IF NOT EXISTS {respaldo} ON personas ({columna})")
+        # Índice de versiones anteriores, reemplazado por el de nombre_norm
+        conn.execute("DROP INDEX IF EXISTS personas_nombre")
+
+    @staticmethod
+    def _verificar_duplicados(conn, nombre_norm, cedula, exclude_id=-1):
+        # Sólo para las columnas sin índice único (ver _asegurar_unicidad): la
+        # comprobación corre en la transacción de escritura, así que nadie
+        # puede insertar el mismo valor entre la consulta y el INSERT/UPDATE.
+        valores = {"nombre_norm": nombre_norm, "cedula": cedula}
+        for indice, columna, _ in INDICES_UNICOS:
+            if valores[columna] is None or conn.execute(SQL_EXISTE_TABLA, (indice,)).fetchone():
+                continue
+            if conn.execute(SQL_DUPLICADO_COLUMNA.format(col=columna),
+                            {"valor": valores[columna], "id": exclude_id}).fetchone():
+                raise PersonaDuplicada(CAMPOS_UNICOS[columna])
+
+    @staticmethod
+    def asegurar_esquema(conn):
+        """Crea las columnas e índices de duplicados, la tabla `ids_libres` y los
+        triggers si faltan (dentro de una transacción de escritura)."""
+        PersonasRepository._asegurar_unicidad(conn)
+        existia = conn.execute(SQL_EXISTE_TABLA, ("ids_libres",)).fetchone() is not None
+        for sql in SQL_ESQUEMA_IDS_LIBRES:
+            conn.execute(sql)
+        if not existia:
+            conn.execute(SQL_RECONSTRUIR_IDS_LIBRES)
+        for (vencida,) in conn.execute(SQL_RESERVAS_VENCIDAS,
+                                       (f"-{RESERVA_VENCE_HORAS} hours",)).fetchall():
+            PersonasRepository._liberar_reserva(conn, vencida)
+
+        existia = conn.execute(SQL_EXISTE_TABLA, ("personas_fts",)).fetchone() is not None
+        try:
+            for sql in SQL_ESQUEMA_FTS:
+                conn.execute(sql)
+        except sqlite3.OperationalError as e:
+            # SQLite compilado sin FTS5: buscar() sigue funcionando con LIKE
+            print(f"Búsqueda de texto completo no disponible ({e}); se usa LIKE.")
+            return
+        if not existia:
+            conn.execute(SQL_FTS_RECONSTRUIR)
+
+    @staticmethod
+    def _primer_id_libre(conn):
+        # Primer hueco en los ids (reutilizar ids de personas eliminadas)
+        return conn.execute(SQL_ID_LIBRE).fetchone()[0]
+
+    def siguiente_id(self):
+        # Solo informativo: para quedarse con el id usar reservar_id
+        with self.transaction() as conn:
+            return self._primer_id_libre(conn)
+
+    def reservar_id(self):
+        """Aparta el primer id libre antes de enrolar y lo devuelve.
+
+        La reserva se escribe en la base (tabla `ids_reservados`) en la misma
+        transacción de escritura que busca el id: ninguna otra GUI ni
+        importación puede tomarlo mientras dura el enrolamiento. Se termina con
+        `confirmar_reserva` (inserta la persona) o `liberar_reserva`.
+        """
+        with self.transaction(write=True) as conn:
+            person_id = self._primer_id_libre(conn)
+            conn.execute(SQL_OCUPAR_LIBRE, (person_id,))
+            conn.execute(SQL_RESERVAR, (person_id,))
+        return person_id
+
+    def confirmar_reserva(self, person_id, nombre, cedula, cargo):
+        """Inserta la persona con el id reservado y borra la reserva (una transacción)."""
+        with self.transaction(write=True) as conn:
+            if conn.execute(SQL_ES_RESERVA, (person_id,)).fetchone() is None:
+                raise ValueError(f"El id {person_id} no está reservado.")
+            self._verificar_duplicados(conn, normalizar_nombre(nombre), _cedula(cedula))
+            conn.execute(SQL_QUITAR_RESERVA, (person_id,))
+            try:
+                conn.execute(SQL_INSERTAR, (person_id, nombre, normalizar_nombre(nombre),
+                                            _cedula(cedula), None, cargo))
+            except sqlite3.IntegrityError as e:
+                raise _duplicada(e) from e
+        return person_id
+
+    @staticmethod
+    def _liberar_reserva(conn, person_id):
+        conn.execute(SQL_QUITAR_RESERVA, (person_id,))
+        if conn.execute(SQL_EXISTE_PERSONA, (person_id,)).fetchone() is None:
+            conn.execute(SQL_LIBERAR_ID, (person_id,))
+
+    def liberar_reserva(self, person_id):
+        """Devuelve un id reservado a los libres (el alta no se completó)."""
+        with self.transaction(write=True) as conn:
+            self._liberar_reserva(conn, person_id)
+
+    def insertar_con_id(self, person_id, nombre, cedula, cargo):
+        with self.transaction(write=True) as conn:
+            if conn.execute(SQL_ES_RESERVA, (person_id,)).fetchone() is not None:
+                raise ValueError(f"El id {person_id} está reservado por un alta en curso.")
+            self._verificar_duplicados(conn, normalizar_nombre(nombre), _cedula(cedula))
+            # Un id más allá del máximo deja un hueco: registrarlo para reutilizarlo
+            maximo = conn.execute(SQL_MAX_ID).fetchone()[0] or 0
+            if person_id > maximo + 1:
+                conn.executemany(SQL_LIBERAR_ID, ((i,) for i in range(maximo + 1, person_id)))
+            try:
+                conn.execute(SQL_INSERTAR, (person_id, nombre, normalizar_nombre(nombre),
+                                            _cedula(cedula), None, cargo))
+            except sqlite3.IntegrityError as e:
+                raise _duplicada(e) from e
+        return person_id
+
+    def insertar(self, nombre, cedula, cargo):
+        # Buscar el hueco e insertar en la misma transacción de escritura:
+        # otro proceso no puede tomar el mismo id en el medio. Un duplicado lo
+        # rechazan los índices únicos en el mismo INSERT (PersonaDuplicada).
+        with self.transaction(write=True) as conn:
+            self._verificar_duplicados(conn, normalizar_nombre(nombre), _cedula(cedula))
+            nuevo_id = self._primer_id_libre(conn)
+            try:
+                conn.execute(SQL_INSERTAR, (nuevo_id, nombre, normalizar_nombre(nombre),
+                                            _cedula(cedula), None, cargo))
+            except sqlite3.IntegrityError as e:
+                raise _duplicada(e) from e
+        return nuevo_id
+
+    @staticmethod
+    def _reservar_ids(conn, cantidad):
+        # Primero los huecos (en orden) y después ids nuevos a partir del mayor usado
+        ids = [i for (i,) in conn.execute(SQL_IDS_LIBRES, (cantidad,))]
+        siguiente = max(conn.execute(SQL_MAX_ID).fetchone()[0] or 0, ids[-1] if ids else 0) + 1
+        ids.extend(range(siguiente, siguiente + cantidad - len(ids)))
+        return ids
+
+    def insertar_lote(self, personas):
+        """Inserta muchas personas (nombre, cedula, cargo) en una sola transacción.
+
+        Se descartan las filas que persona_existe rechazaría: mismo nombre
+        (normalizado) o misma cédula que alguien de la base o que una fila
+        anterior del lote.
+        Las cédulas vacías no cuentan como duplicadas.
+
+        Returns:
+            (insertadas, duplicadas): listas de (índice en `personas`, id) para
+            las insertadas y de índices para las descartadas
+        """
+        filas = [(i, nombre, normalizar_nombre(nombre), _cedula(cedula), cargo)
+                 for i, (nombre, cedula, cargo) in enumerate(personas)]
+        with self.transaction(write=True) as conn:
+            conn.execute(SQL_LOTE_CREAR)
+            for sql in SQL_LOTE_INDICES:
+                conn.execute(sql)
+            try:
+                conn.executemany(SQL_LOTE_CARGAR, ((f[0], f[2], f[3]) for f in filas))
+                duplicadas = {fila for (fila,) in conn.execute(SQL_LOTE_DUPLICADOS)}
+            finally:
+                conn.execute(SQL_LOTE_BORRAR)
+            nuevas = [f for f in filas if f[0] not in duplicadas]
+            ids = self._reservar_ids(conn, len(nuevas))
+            conn.executemany(SQL_INSERTAR, ((pid, nombre, norm, cedula, None, cargo)
+                                            for pid, (_, nombre, norm, cedula, cargo) in zip(ids, nuevas)))
+        return [(f[0], pid) for f, pid in zip(nuevas, ids)], sorted(duplicadas)
+
+    def editar(self, id, nombre=None, cedula=None, hora_ingreso=None, cargo=None):
+        # Los valores vacíos no modifican el campo (igual que antes). Si el
+        # cambio choca con otra persona se lanza PersonaDuplicada y no se guarda nada.
+        with self.transaction(write=True) as conn:
+            self._verificar_duplicados(conn, normalizar_nombre(nombre), _cedula(cedula), id)
+            try:
+                conn.execute(SQL_EDITAR, (nombre or None, normalizar_nombre(nombre), _cedula(cedula),
+                                          hora_ingreso or None, cargo or None, id))
+            except sqlite3.IntegrityError as e:
+                raise _duplicada(e) from e
+
+    def eliminar(self, id, retener_id=False):
+        """Borra la persona. Con `retener_id` su id queda reservado (en la misma
+        transacción) hasta `liberar_reserva`: así no se reutiliza mientras
+        todavía hay fotos suyas en faces/ o su label sigue en el modelo."""
+        with self.transaction(write=True) as conn:
+            borradas = conn.execute(SQL_ELIMINAR, (id,)).rowcount
+            if retener_id and borradas:
+                conn.execute(SQL_OCUPAR_LIBRE, (id,))
+                conn.execute(SQL_RESERVAR, (id,))
+
+    @staticmethod
+    def _consulta_fts(termino):
+        # Cada palabra se busca como prefijo ("fab" encuentra "Fabrizzio") y
+        # todas tienen que aparecer; las comillas evitan que se interprete la
+        # sintaxis de FTS5 que pudiera escribir el usuario.
+        palabras = re.findall(r"\w+", termino)
+        return " ".join(f'"{p}"*' for p in palabras)
+
+    def buscar(self, termino, limite=None, desde=0):
+        """Personas que coinciden con `termino`, de a `limite` filas a partir de `desde`.
+
+        Una cédula completa se resuelve por su índice; el resto va al índice de
+        texto completo (prefijos, sin distinguir acentos ni mayúsculas, ordenado
+        por relevancia). Sin FTS5 se usa LIKE sobre las tres columnas.
+        """
+        limite = -1 if limite is None else limite
+        termino = termino.strip()
+        with self.transaction() as conn:
+            if termino.isdigit():
+                filas = conn.execute(SQL_BUSCAR_CEDULA, (termino,)).fetchall()
+                if filas:
+                    return filas[desde:] if limite < 0 else filas[desde:desde + limite]
+            consulta = self._consulta_fts(termino)
+            if consulta and conn.execute(SQL_EXISTE_TABLA, ("personas_fts",)).fetchone():
+                return conn.execute(SQL_BUSCAR_FTS, (consulta, limite, desde)).fetchall()
+            like_term = f"%{termino}%"
+            return conn.execute(SQL_BUSCAR, (like_term, like_term, like_term, limite, desde)).fetchall()
+
+    def existe(self, nombre, cedula, exclude_id=None):
+        # Reglas: si existe el mismo nombre -> existe (no permitir duplicados por nombre).
+        # También no permitir cédulas duplicadas. El cargo puede repetirse sin problema.
+        # Los nombres se comparan normalizados. Sin exclude_id se compara contra -1, que ningún id usa.
+        with self.transaction() as conn:
+            row = conn.execute(SQL_EXISTE, (normalizar_nombre(nombre), _cedula(cedula),
+                                            -1 if exclude_id is None else exclude_id)).fetchone()
+        return row is not None
+
+
+_repositories = {}
+_repositories_lock = threading.Lock()
+
+
+def get_repository(db_path=None):
+    """Repositorio compartido por todo el proceso para `db_path` (por defecto DB_PATH)."""
+    key = os.path.abspath(db_path or DB_PATH)
+    with _repositories_lock:
+        repo = _repositories.get(key)
+        if repo is None:
+            repo = _repositories[key] = PersonasRepository(key)
+        return repo
 
 
 def crear_base_de_datos():
@@ -15,185 +560,120 @@ def crear_base_de_datos():
         if not os.path.exists(ruta):
             os.makedirs(ruta)
 
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-
         # Crear la tabla para almacenar personas y sus características
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS personas (
-                id INTEGER PRIMARY KEY,
-                nombre TEXT,
-                cedula TEXT,
-                ultima_hora_ingreso TEXT,
-                cargo TEXT
-            )
-        ''')
-
-        conn.commit()
-        conn.close()
+        get_repository().activar_wal()
+        with get_repository().transaction(write=True) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS personas (
+                    id INTEGER PRIMARY KEY,
+                    nombre TEXT,
+                    cedula TEXT,
+                    ultima_hora_ingreso TEXT,
+                    cargo TEXT,
+                    nombre_norm TEXT
+                )
+            ''')
+            PersonasRepository.asegurar_esquema(conn)
         print(f"Base de datos creada en: {db_path}")
     else:
         # Si ya existe la base de datos, comprobar si la tabla fue creada con AUTOINCREMENT
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
         try:
-            c.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='personas'")
-            row = c.fetchone()
-            if row and row[0] and 'AUTOINCREMENT' in row[0].upper():
-                # Necesitamos migrar la tabla para quitar AUTOINCREMENT y conservar datos
-                print('Migrando tabla personas para eliminar AUTOINCREMENT...')
-                c.execute('BEGIN')
-                # Crear tabla temporal sin AUTOINCREMENT
-                c.execute('''
-                    CREATE TABLE IF NOT EXISTS personas_new (
-                        id INTEGER PRIMARY KEY,
-                        nombre TEXT,
-                        cedula TEXT,
-                        ultima_hora_ingreso TEXT,
-                        cargo TEXT
-                    )
-                ''')
-                # Copiar datos existentes
-                c.execute('''INSERT OR IGNORE INTO personas_new (id, nombre, cedula, ultima_hora_ingreso, cargo)
-                             SELECT id, nombre, cedula, ultima_hora_ingreso, cargo FROM personas''')
-                # Eliminar tabla antigua y renombrar
-                c.execute('DROP TABLE personas')
-                c.execute('ALTER TABLE personas_new RENAME TO personas')
-                # Limpiar secuencia (si existe)
-                try:
-                    c.execute("DELETE FROM sqlite_sequence WHERE name='personas'")
-                except Exception:
-                    pass
-                conn.commit()
-                print('Migración completada.')
+            get_repository().activar_wal()
+            with get_repository().transaction(write=True) as c:
+                row = c.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='personas'").fetchone()
+                if row and row[0] and 'AUTOINCREMENT' in row[0].upper():
+                    # Necesitamos migrar la tabla para quitar AUTOINCREMENT y conservar datos
+                    print('Migrando tabla personas para eliminar AUTOINCREMENT...')
+                    # Crear tabla temporal sin AUTOINCREMENT
+                    c.execute('''
+                        CREATE TABLE IF NOT EXISTS personas_new (
+                            id INTEGER PRIMARY KEY,
+                            nombre TEXT,
+                            cedula TEXT,
+                            ultima_hora_ingreso TEXT,
+                            cargo TEXT
+                        )
+                    ''')
+                    # Copiar datos existentes
+                    c.execute('''INSERT OR IGNORE INTO personas_new (id, nombre, cedula, ultima_hora_ingreso, cargo)
+                                 SELECT id, nombre, cedula, ultima_hora_ingreso, cargo FROM personas''')
+                    # Eliminar tabla antigua y renombrar
+                    c.execute('DROP TABLE personas')
+                    c.execute('ALTER TABLE personas_new RENAME TO personas')
+                    # Limpiar secuencia (si existe)
+                    try:
+                        c.execute("DELETE FROM sqlite_sequence WHERE name='personas'")
+                    except Exception:
+                        pass
+                    print('Migración completada.')
+                PersonasRepository.asegurar_esquema(c)
         except Exception as e:
             print('Error comprobando/migrando la base de datos:', e)
-        finally:
-            conn.close()
         print(f"El archivo de la base de datos ya existe en: {db_path}")
 
-def mostrar_personas():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
-    c.execute("SELECT * FROM personas")
-    personas = c.fetchall()
+def liberar_conexion():
+    """Cierra la conexión del hilo actual; para hilos de vida corta al terminar."""
+    get_repository().reconnect()
 
-    conn.close()
-    return personas
+def mostrar_personas():
+    return get_repository().listar()
 
 
 def obtener_siguiente_id():
-    """Calcula el siguiente id disponible (sin insertar en la base).
-    Útil para reservar un id antes de realizar enrolamiento/entrenamiento.
+    """Calcula el siguiente id disponible (sin insertar ni reservar nada).
+    Para quedarse con el id antes de enrolar/entrenar usar `reservar_id()`.
     """
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT id FROM personas ORDER BY id")
-    filas = c.fetchall()
-    conn.close()
-    ids = [r[0] for r in filas]
-
-    nuevo_id = 1
-    for existing in ids:
-        if existing == nuevo_id:
-            nuevo_id += 1
-        elif existing > nuevo_id:
-            break
-    return nuevo_id
+    return get_repository().siguiente_id()
 
 
-def insertar_persona_con_id(person_id, nombre, cedula, cargo):
-    """Inserta una persona usando un `person_id` ya decidido por el caller.
-    Devuelve el id insertado.
-    """
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''INSERT INTO personas (id, nombre, cedula, ultima_hora_ingreso, cargo)
-                 VALUES (?, ?, ?, ?, ?)''', (person_id, nombre, cedula, None, cargo))
-    conn.commit()
-    conn.close()
-    return person_id
+def reservar_id():
+    """Reserva el próximo id libre en la base (ver PersonasRepository.reservar_id)."""
+    return get_repository().reservar_id()
 
-def insertar_persona(nombre, cedula, cargo):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
-    # Intentar usar el ID más bajo disponible (reutilizar huecos de eliminaciones)
-    # Obtenemos todos los IDs existentes ordenados y buscamos el primer hueco
-    c.execute("SELECT id FROM personas ORDER BY id")
-    filas = c.fetchall()
-    ids = [r[0] for r in filas]
-
-    nuevo_id = 1
-    for existing in ids:
-        if existing == nuevo_id:
-            nuevo_id += 1
-        elif existing > nuevo_id:
-            # encontramos un hueco: existing > nuevo_id
-            break
-
-    # Insertar especificando el id calculado
-    c.execute('''INSERT INTO personas (id, nombre, cedula, ultima_hora_ingreso, cargo)
-                 VALUES (?, ?, ?, ?, ?)''', (nuevo_id, nombre, cedula, None, cargo))
-
-    conn.commit()
-    conn.close()
-    return nuevo_id
 
-def editar_persona(id, nombre=None, cedula=None, hora_ingreso=None, cargo=None):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+def confirmar_reserva(person_id, nombre, cedula, cargo):
+    """Inserta la persona con un id reservado. Lanza PersonaDuplicada si ya existe."""
+    return get_repository().confirmar_reserva(person_id, nombre, cedula, cargo)
 
-    if nombre:
-        c.execute("UPDATE personas SET nombre = ? WHERE id = ?", (nombre, id))
-    if cedula:
-        c.execute("UPDATE personas SET cedula = ? WHERE id = ?", (cedula, id))
-    if hora_ingreso:
-        c.execute("UPDATE personas SET ultima_hora_ingreso = ? WHERE id = ?", (hora_ingreso, id))
-    if cargo:
-        c.execute("UPDATE personas SET cargo = ? WHERE id = ?", (cargo, id))
 
-    conn.commit()
-    conn.close()
+def liberar_reserva(person_id):
+    """Libera un id reservado cuyo alta se canceló o falló."""
+    get_repository().liberar_reserva(person_id)
 
-def eliminar_persona(id):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
 
-    c.execute("DELETE FROM personas WHERE id = ?", (id,))
+def insertar_persona_con_id(person_id, nombre, cedula, cargo):
+    """Inserta una persona usando un `person_id` ya decidido por el caller.
+    Devuelve el id insertado.
+    """
+    return get_repository().insertar_con_id(person_id, nombre, cedula, cargo)
 
-    conn.commit()
-    conn.close()
+def insertar_persona(nombre, cedula, cargo):
+    # Usa el ID más bajo disponible (reutiliza huecos de eliminaciones).
+    # Lanza PersonaDuplicada si el nombre o la cédula ya están cargados.
+    return get_repository().insertar(nombre, cedula, cargo)
 
-def buscar_personas(termino):
-    """Buscar personas por nombre, cédula o cargo usando LIKE (case-insensitive)."""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+def insertar_personas(personas):
+    """Inserta una lista de (nombre, cedula, cargo) en una sola transacción.
+    Devuelve (insertadas, duplicadas); ver PersonasRepository.insertar_lote.
+    """
+    return get_repository().insertar_lote(personas)
+
+def editar_persona(id, nombre=None, cedula=None, hora_ingreso=None, cargo=None):
+    get_repository().editar(id, nombre=nombre, cedula=cedula, hora_ingreso=hora_ingreso, cargo=cargo)
 
-    like_term = f"%{termino}%"
-    c.execute("SELECT * FROM personas WHERE nombre LIKE ? OR cedula LIKE ? OR cargo LIKE ?", (like_term, like_term, like_term))
-    resultados = c.fetchall()
+def eliminar_persona(id, retener_id=False):
+    get_repository().eliminar(id, retener_id=retener_id)
 
-    conn.close()
-    return resultados
+def buscar_personas(termino, limite=None, desde=0):
+    """Buscar personas por nombre, cédula o cargo (prefijos, sin distinguir acentos).
+    `limite` y `desde` paginan los resultados, ordenados por relevancia.
+    """
+    return get_repository().buscar(termino, limite, desde)
 
 def persona_existe(nombre, cedula, exclude_id=None):
-    """Devuelve True si ya existe una persona con el mismo nombre+cedula o la misma cédula.
+    """Devuelve True si ya existe una persona con el mismo nombre (normalizado) o la misma cédula.
     Si `exclude_id` se proporciona, ignora esa fila (útil al editar).
     """
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
-    # Reglas: si existe el mismo nombre -> existe (no permitir duplicados por nombre).
-    # También no permitir cédulas duplicadas. El cargo puede repetirse sin problema.
-    if exclude_id is None:
-        c.execute("SELECT id FROM personas WHERE nombre = ? OR cedula = ?", (nombre, cedula))
-    else:
-        c.execute("SELECT id FROM personas WHERE (nombre = ? OR cedula = ?) AND id != ?", (nombre, cedula, exclude_id))
-
-    row = c.fetchone()
-    conn.close()
-    return row is not None
+    return get_repository().existe(nombre, cedula, exclude_id)
 
-# crear_base_de_datos()
\ No newline at end of file
+# crear_base_de_datos()
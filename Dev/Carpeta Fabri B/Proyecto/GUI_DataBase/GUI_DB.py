@@ -18,10 +18,15 @@ try:
         insertar_persona,
         insertar_persona_con_id,
         obtener_siguiente_id,
+        reservar_id,
+        confirmar_reserva,
+        liberar_reserva,
         editar_persona,
         eliminar_persona,
         buscar_personas,
         persona_existe,
+        PersonaDuplicada,
+        liberar_conexion,
     )
 except Exception:
     # When executed as a script: python GUI_DataBase/GUI_DB.py
@@ -31,15 +36,58 @@ except Exception:
         insertar_persona,
         insertar_persona_con_id,
         obtener_siguiente_id,
+        reservar_id,
+        confirmar_reserva,
+        liberar_reserva,
         editar_persona,
         eliminar_persona,
         buscar_personas,
         persona_existe,
+        PersonaDuplicada,
+        liberar_conexion,
     )
 from threading import Thread
 from tkinter import Toplevel, Label
+from config import FACES_DIR
 from FRT.enrolar_persona import enroll_person
-from FRT.entrenar_modelo import train_model
+from FRT.entrenar_modelo import scan_faces, train_model
+
+
+def _rmtree_folder(path):
+    try:
+        p = Path(path)
+        if p.exists() and p.is_dir():
+            for f in p.iterdir():
+                try:
+                    if f.is_file():
+                        f.unlink()
+                    elif f.is_dir():
+                        # recursive
+                        import shutil
+                        shutil.rmtree(f)
+                except Exception:
+                    pass
+            try:
+                p.rmdir()
+            except Exception:
+                pass
+    except Exception:
+        pass
+
+
+def _olvidar_persona(person_id):
+    """Borra las muestras de `person_id` y reentrena sin ellas.
+
+    Devuelve True si ni faces/ ni el modelo conservan sus muestras; recién
+    entonces su id puede volver a usarse (si no, la próxima persona con ese id
+    heredaría sus fotos y su label).
+    """
+    person_dir = Path(FACES_DIR) / str(person_id)
+    _rmtree_folder(person_dir)
+    if person_dir.exists():
+        return False
+    # Sin ninguna carpeta no hay qué entrenar: el próximo entrenamiento es completo
+    return train_model(incremental=True) or not scan_faces()
 
 
 class PersonasGUI:
@@ -151,7 +199,7 @@ class PersonasGUI:
             tag = 'even' if i % 2 == 0 else 'odd'
             id_, nombre, cedula, ultima, cargo = p
             hora_text = ultima if ultima else '-'
-            self.tree.insert('', 'end', iid=str(id_), values=(id_, nombre, cedula, cargo, hora_text), tags=(tag,))
+            self.tree.insert('', 'end', iid=str(id_), values=(id_, nombre, cedula or '', cargo, hora_text), tags=(tag,))
 
     def agregar(self):
         nombre = self.entry_nombre.get().strip()
@@ -179,8 +227,10 @@ class PersonasGUI:
             messagebox.showwarning('Advertencia', 'Ya existe una persona con esa cédula o los mismos datos.')
             return
 
-        # Obtener siguiente id disponible (sin insertar aún)
-        next_id = obtener_siguiente_id()
+        # Reservar el id en la base antes de enrolar: las fotos y el modelo quedan
+        # atados a él, así que nadie más puede tomarlo hasta confirmar o liberar
+        next_id = reservar_id()
+        person_dir = Path(FACES_DIR) / str(next_id)
 
         # Mostrar diálogo de progreso sencillo
         progress_win = Toplevel(self.root)
@@ -202,52 +252,43 @@ class PersonasGUI:
                 lbl.config(text=f"{msg} ({pct}%)")
             self.root.after(0, _upd)
 
-        def _rmtree_folder(path):
+        def _cancelar_alta(trained_started):
+            # Borrar las muestras; si ya entraron al modelo, reentrenar sin ellas.
+            # Recién entonces el id puede volver a usarse (ver _olvidar_persona).
             try:
-                p = Path(path)
-                if p.exists() and p.is_dir():
-                    for f in p.iterdir():
-                        try:
-                            if f.is_file():
-                                f.unlink()
-                            elif f.is_dir():
-                                # recursive
-                                import shutil
-                                shutil.rmtree(f)
-                        except Exception:
-                            pass
-                    try:
-                        p.rmdir()
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-
+                if trained_started:
+                    if not _olvidar_persona(next_id):
+                        raise RuntimeError('no se pudo reentrenar sin las muestras')
+                else:
+                    _rmtree_folder(person_dir)
+                liberar_reserva(next_id)
+            except Exception as e:
+                print(f"No se liberó el id {next_id}: {e}")
 
         def worker():
+            trained_started = False
             try:
                 # 1) Enrolar: abrir cámara y capturar muestras en FACES_DIR/{next_id}
                 ok, emsg, taken = enroll_person(str(next_id), nombre, progress_cb=progress_cb)
                 if not ok:
-                    # cleanup carpeta parcial
-                    _rmtree_folder(Path(__file__).resolve().parents[1] / 'faces' / str(next_id))
                     raise RuntimeError(f"Enrolamiento falló: {emsg}")
 
                 # Verificar número mínimo de muestras
                 min_required = 20
                 if taken < min_required:
-                    # eliminar muestras parciales
-                    _rmtree_folder(Path(__file__).resolve().parents[1] / 'faces' / str(next_id))
                     raise RuntimeError(f"Enrolamiento incompleto: solo se capturaron {taken} imágenes (mínimo {min_required}).")
 
-                # 2) Entrenar el modelo con las nuevas imágenes
+                # 2) Entrenar el modelo con las nuevas imágenes (solo se agregan las
+                #    de la persona nueva; se reentrena completo si algo más cambió)
                 self.root.after(0, lambda: lbl.config(text='Entrenando modelo...'))
-                trained = train_model()
+                trained_started = True
+                trained = train_model(incremental=True)
                 if not trained:
                     raise RuntimeError('Entrenamiento falló o no hay imágenes para entrenar.')
 
-                # 3) Si todo OK, insertar la persona en la base usando el id reservado
-                inserted_id = insertar_persona_con_id(next_id, nombre, cedula, cargo)
+                # 3) Si todo OK, insertar la persona con el id reservado (los
+                #    duplicados los rechaza la base en la misma transacción)
+                inserted_id = confirmar_reserva(next_id, nombre, cedula, cargo)
                 # Actualizar UI en el hilo principal
                 def _done():
                     progress_win.grab_release()
@@ -260,6 +301,7 @@ class PersonasGUI:
                     self.btn_delete.config(state='normal')
                 self.root.after(0, _done)
             except Exception as e:
+                _cancelar_alta(trained_started)
                 # En caso de error, cerrar ventana de progreso y avisar
                 def _error():
                     try:
@@ -272,6 +314,9 @@ class PersonasGUI:
                     self.btn_edit.config(state='normal')
                     self.btn_delete.config(state='normal')
                 self.root.after(0, _error)
+            finally:
+                # El hilo termina acá: cerrar su conexión a la base
+                liberar_conexion()
 
         Thread(target=worker, daemon=True).start()
 
@@ -321,12 +366,12 @@ class PersonasGUI:
             messagebox.showwarning('Advertencia', 'El cargo no puede contener números.')
             return
 
-        # Verificar duplicados excluyendo el registro actual
-        if persona_existe(nombre, cedula, exclude_id=self.selected_id):
+        # Los duplicados los rechaza la base en la misma actualización
+        try:
+            editar_persona(self.selected_id, nombre=nombre, cedula=cedula, cargo=cargo)
+        except PersonaDuplicada:
             messagebox.showwarning('Advertencia', 'Otro registro ya tiene estos datos o la misma cédula.')
             return
-
-        editar_persona(self.selected_id, nombre=nombre, cedula=cedula, cargo=cargo)
         messagebox.showinfo('Éxito', 'Persona actualizada')
         self.clear_form()
         self.refrescar()
@@ -336,11 +381,38 @@ class PersonasGUI:
             messagebox.showwarning('Advertencia', 'Seleccione una persona para eliminar.')
             return
         if messagebox.askyesno('Confirmar', '¿Eliminar la persona seleccionada?'):
-            eliminar_persona(self.selected_id)
+            person_id = self.selected_id
+            # El id queda reservado hasta borrar sus fotos y reentrenar sin ellas;
+            # después vuelve a los ids libres (ver _olvidar_persona)
+            eliminar_persona(person_id, retener_id=True)
             messagebox.showinfo('Éxito', 'Persona eliminada')
             self.clear_form()
             self.refrescar()
 
+            # Mientras se reentrena no se puede agregar a nadie (dos entrenamientos a la vez)
+            self.btn_add.config(state='disabled')
+            self.btn_edit.config(state='disabled')
+            self.btn_delete.config(state='disabled')
+
+            def worker():
+                try:
+                    if _olvidar_persona(person_id):
+                        liberar_reserva(person_id)
+                    else:
+                        print(f"No se liberó el id {person_id}: no se pudo reentrenar sin sus muestras")
+                except Exception as e:
+                    print(f"No se liberó el id {person_id}: {e}")
+                finally:
+                    liberar_conexion()
+
+                    def _done():
+                        self.btn_add.config(state='normal')
+                        self.btn_edit.config(state='normal')
+                        self.btn_delete.config(state='normal')
+                    self.root.after(0, _done)
+
+            Thread(target=worker, daemon=True).start()
+
     def buscar(self):
         termino = self.entry_buscar.get().strip()
         if not termino:
@@ -353,7 +425,7 @@ class PersonasGUI:
             tag = 'even' if i % 2 == 0 else 'odd'
             id_, nombre, cedula, ultima, cargo = p
             hora_text = ultima if ultima else '-'
-            self.tree.insert('', 'end', iid=str(id_), values=(id_, nombre, cedula, cargo, hora_text), tags=(tag,))
+            self.tree.insert('', 'end', iid=str(id_), values=(id_, nombre, cedula or '', cargo, hora_text), tags=(tag,))
 
     def clear_form(self):
         self.entry_nombre.delete(0, tk.END)
@@ -0,0 +1,190 @@
+"""Importación y exportación de personas por lotes (CSV o JSON).
+
+Importar un sitio entero con la GUI es una persona por vez y un commit por
+persona. Acá todas las filas entran con `executemany` en una sola transacción
+y los duplicados (mismas reglas que persona_existe) se descartan con una sola
+consulta en SQLite (ver PersonasRepository.insertar_lote).
+
+Columnas: nombre, cedula, cargo y opcionalmente carpeta. Con `--caras`, las
+fotos de cada persona se buscan en `<caras>/<carpeta>` (o `<caras>/<cedula>` si
+no hay columna carpeta), se normalizan como en el enrolamiento y se guardan en
+FACES_DIR/<id>. La exportación escribe las mismas columnas (más id y
+ultima_hora_ingreso) y con `--caras` copia las carpetas de fotos, así el
+resultado se puede volver a importar en otra instalación.
+
+    python GUI_DataBase/importar_exportar.py importar personas.csv --caras fotos/ --entrenar
+    python GUI_DataBase/importar_exportar.py exportar personas.json --caras respaldo_caras/
+"""
+import argparse
+import csv
+import json
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import cv2
+
+# Asegurar que la raíz del proyecto esté en sys.path (para `config` y `FRT`)
+proj_root = Path(__file__).resolve().parents[1]
+if str(proj_root) not in sys.path:
+    sys.path.insert(0, str(proj_root))
+
+try:
+    from .Data_Base import crear_base_de_datos, insertar_personas, mostrar_personas
+except ImportError:
+    from Data_Base import crear_base_de_datos, insertar_personas, mostrar_personas
+from config import FACES_DIR
+from FRT.enrolar_persona import FACE_SIZE, detect_face
+from FRT.escritura import SampleWriter
+from FRT.fuentes import IMAGE_EXTENSIONS
+from FRT.entrenar_modelo import LOAD_WORKERS, train_model
+
+COLUMNAS = ("id", "nombre", "cedula", "cargo", "ultima_hora_ingreso", "carpeta")
+
+
+def leer_personas(path):
+    """Filas del archivo como diccionarios (CSV con encabezado o lista JSON de objetos)."""
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        filas = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(filas, list):
+            raise ValueError("El JSON debe ser una lista de personas.")
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as fh:
+            filas = list(csv.DictReader(fh))
+    personas = []
+    for n, fila in enumerate(filas, start=1):
+        nombre = str(fila.get("nombre") or "").strip()
+        if not nombre:
+            raise ValueError(f"Fila {n}: falta el nombre.")
+        personas.append({
+            "nombre": nombre,
+            "cedula": str(fila.get("cedula") or "").strip(),
+            "cargo": str(fila.get("cargo") or "").strip(),
+            "carpeta": str(fila.get("carpeta") or "").strip(),
+        })
+    return personas
+
+
+def _normalizar(path):
+    """Cara normalizada de una foto (o None si no se encuentra una cara)."""
+    gray = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+    if gray is None:
+        return None
+    if gray.shape[::-1] == FACE_SIZE:
+        # Ya es una muestra de enrolamiento (p. ej. de una exportación)
+        return gray
+    res = detect_face(gray)
+    if res is None:
+        return None
+    return cv2.equalizeHist(cv2.resize(res[0], FACE_SIZE))
+
+
+def _importar_caras(origen, person_id, writer):
+    """Normaliza las fotos de `origen` y las encola para FACES_DIR/<person_id>. Devuelve cuántas."""
+    destino = Path(FACES_DIR) / str(person_id)
+    destino.mkdir(parents=True, exist_ok=True)
+    fotos = sorted(f for f in Path(origen).iterdir() if f.suffix.lower() in IMAGE_EXTENSIONS)
+    guardadas = 0
+    for foto in fotos:
+        face = _normalizar(foto)
+        if face is not None:
+            writer.submit(destino / f"{person_id}_importada_{guardadas:03d}.png", face)
+            guardadas += 1
+    return guardadas
+
+
+def importar(path, caras=None, entrenar=False):
+    """Importa las personas de `path`; con `caras`, también sus fotos.
+
+    Returns:
+        resumen con las personas insertadas, las duplicadas y las fotos guardadas
+    """
+    t0 = time.perf_counter()
+    personas = leer_personas(path)
+    crear_base_de_datos()
+    insertadas, duplicadas = insertar_personas(
+        [(p["nombre"], p["cedula"], p["cargo"]) for p in personas])
+    t_db = time.perf_counter() - t0
+
+    fotos, sin_fotos = 0, []
+    if caras:
+        trabajos = []
+        for i, person_id in insertadas:
+            p = personas[i]
+            clave = p["carpeta"] or p["cedula"]
+            if clave and (Path(caras) / clave).is_dir():
+                trabajos.append((Path(caras) / clave, person_id))
+            else:
+                sin_fotos.append(p["nombre"])
+        writer = SampleWriter()
+        try:
+            # El detector es uno por hilo (FRT/detector.py): las personas se procesan en paralelo
+            with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+                fotos = sum(pool.map(lambda t: _importar_caras(t[0], t[1], writer), trabajos))
+        finally:
+            writer.close()
+
+    if entrenar and fotos:
+        train_model(incremental=True)
+
+    return {
+        "insertadas": [(personas[i]["nombre"], person_id) for i, person_id in insertadas],
+        "duplicadas": [personas[i]["nombre"] for i in duplicadas],
+        "fotos": fotos,
+        "sin_fotos": sin_fotos,
+        "segundos_bd": t_db,
+        "segundos": time.perf_counter() - t0,
+    }
+
+
+def exportar(path, caras=None):
+    """Escribe todas las personas en `path` (CSV o JSON); con `caras`, copia sus fotos."""
+    path = Path(path)
+    filas = []
+    for pid, nombre, cedula, ultima, cargo in mostrar_personas():
+        carpeta = ""
+        origen = Path(FACES_DIR) / str(pid)
+        if caras and origen.is_dir():
+            shutil.copytree(origen, Path(caras) / str(pid), dirs_exist_ok=True)
+            carpeta = str(pid)
+        filas.append({"id": pid, "nombre": nombre or "", "cedula": cedula or "",
+                      "cargo": cargo or "", "ultima_hora_ingreso": ultima or "",
+                      "carpeta": carpeta})
+    if path.suffix.lower() == ".json":
+        path.write_text(json.dumps(filas, ensure_ascii=False, indent=2), encoding="utf-8")
+    else:
+        with open(path, "w", newline="", encoding="utf-8-sig") as fh:
+            writer = csv.DictWriter(fh, fieldnames=COLUMNAS)
+            writer.writeheader()
+            writer.writerows(filas)
+    return len(filas)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importar/exportar personas por lotes (CSV o JSON)")
+    sub = parser.add_subparsers(dest="accion", required=True)
+    p_imp = sub.add_parser("importar", help="agregar personas desde un archivo")
+    p_imp.add_argument("archivo")
+    p_imp.add_argument("--caras", help="carpeta con una subcarpeta de fotos por persona")
+    p_imp.add_argument("--entrenar", action="store_true",
+                       help="entrenar el modelo (incremental) con las fotos importadas")
+    p_exp = sub.add_parser("exportar", help="escribir todas las personas en un archivo")
+    p_exp.add_argument("archivo")
+    p_exp.add_argument("--caras", help="carpeta donde copiar las fotos de cada persona")
+    args = parser.parse_args()
+
+    if args.accion == "importar":
+        res = importar(args.archivo, args.caras, args.entrenar)
+        print(f"[OK] {len(res['insertadas'])} personas insertadas en {res['segundos_bd']:.2f} s")
+        if res["duplicadas"]:
+            print(f"[Aviso] {len(res['duplicadas'])} duplicadas descartadas: "
+                  + ", ".join(res["duplicadas"][:10]) + (" ..." if len(res["duplicadas"]) > 10 else ""))
+        if args.caras:
+            print(f"[OK] {res['fotos']} fotos importadas; {len(res['sin_fotos'])} personas sin carpeta de fotos")
+        print(f"Tiempo total: {res['segundos']:.2f} s")
+    else:
+        n = exportar(args.archivo, args.caras)
+        print(f"[OK] {n} personas exportadas a {args.archivo}")
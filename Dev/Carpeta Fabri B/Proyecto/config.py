@@ -11,8 +11,22 @@ FRT_DIR = os.path.join(PROJECT_ROOT, 'FRT')
 DB_PATH = os.path.join(GUI_DB_DIR, 'personas.db')
 FACES_DIR = os.path.join(GUI_DB_DIR, 'faces')
 MODEL_DIR = os.path.join(FRT_DIR, 'model')
+# Versiones del modelo: cada entrenamiento se publica en model/versions/<versión>/
+# y model/current.json apunta a la vigente. Las rutas de abajo son los nombres de
+# archivo dentro de cada versión (y el formato anterior, sin versiones).
+MODEL_VERSIONS_DIR = os.path.join(MODEL_DIR, 'versions')
+MODEL_CURRENT_PATH = os.path.join(MODEL_DIR, 'current.json')
 MODEL_PATH = os.path.join(MODEL_DIR, 'model_lbph.yml')
+# Mismo modelo en formato binario (memory-mapped) para arrancar rápido al reconocer
+MODEL_BIN_PATH = os.path.join(MODEL_DIR, 'model_lbph.bin')
 LABELS_PATH = os.path.join(MODEL_DIR, 'labels.json')
+TRAIN_MANIFEST_PATH = os.path.join(MODEL_DIR, 'train_manifest.json')
+# Metadatos del modelo (umbral calibrado, etc.)
+MODEL_META_PATH = os.path.join(MODEL_DIR, 'model_meta.json')
+# Dataset empaquetado: todas las caras en un único array memory-mapped
+FACES_PACK_PATH = os.path.join(MODEL_DIR, 'faces_pack.npy')
+FACES_PACK_LABELS_PATH = os.path.join(MODEL_DIR, 'faces_pack_labels.npy')
+FACES_PACK_MANIFEST_PATH = os.path.join(MODEL_DIR, 'faces_pack.json')
 
 # Asegurar que las carpetas existan
 os.makedirs(GUI_DB_DIR, exist_ok=True)
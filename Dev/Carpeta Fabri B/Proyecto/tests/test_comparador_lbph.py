@@ -0,0 +1,111 @@
+"""Paridad de FRT/comparador_lbph.py con `cv2.face.LBPHFaceRecognizer`.
+
+El comparador reimplementa en NumPy el LBP, el histograma espacial y la
+distancia chi-cuadrado de OpenCV; si cambia alguno de los tres, estos tests
+lo detectan antes de que cambien los resultados del reconocimiento.
+
+    python -m pytest tests/
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+if not hasattr(cv2, "face"):
+    pytest.skip("opencv-contrib (cv2.face) no está instalado", allow_module_level=True)
+
+# La raíz del proyecto en sys.path para importar `FRT`
+proj_root = Path(__file__).resolve().parents[1]
+if str(proj_root) not in sys.path:
+    sys.path.insert(0, str(proj_root))
+
+from FRT.comparador_lbph import LBPHMatcher
+
+FACE_SIZE = (64, 64)
+PEOPLE = 5
+SAMPLES = 6
+
+
+def _faces(seed, people=PEOPLE, samples=SAMPLES):
+    """Caras sintéticas: un patrón suavizado por persona más ruido por muestra."""
+    rng = np.random.default_rng(seed)
+    images, labels = [], []
+    for person in range(people):
+        base = cv2.GaussianBlur(rng.integers(0, 256, FACE_SIZE, dtype=np.uint8), (5, 5), 0)
+        for _ in range(samples):
+            noise = rng.normal(0, 12, FACE_SIZE)
+            images.append(np.clip(base + noise, 0, 255).astype(np.uint8))
+            labels.append(person + 1)
+    return images, np.array(labels, dtype=np.int32)
+
+
+def _train(radius=1, neighbors=8):
+    images, labels = _faces(seed=0)
+    recognizer = cv2.face.LBPHFaceRecognizer_create(radius=radius, neighbors=neighbors)
+    recognizer.train(images, labels)
+    return recognizer
+
+
+@pytest.mark.parametrize("radius, neighbors", [(1, 8), (2, 8)])
+def test_predict_batch_igual_que_opencv(radius, neighbors):
+    recognizer = _train(radius, neighbors)
+    matcher = LBPHMatcher.from_recognizer(recognizer)
+    probes, _ = _faces(seed=1)
+
+    labels, dists = matcher.predict_batch(np.stack(probes), k=1)
+    for i, probe in enumerate(probes):
+        label, dist = recognizer.predict(probe)
+        assert labels[i, 0] == label
+        assert dists[i, 0] == pytest.approx(dist, rel=1e-5, abs=1e-4)
+
+
+def test_predict_de_a_una_igual_que_en_lote():
+    matcher = LBPHMatcher.from_recognizer(_train())
+    probes, _ = _faces(seed=2)
+    labels, dists = matcher.predict_batch(np.stack(probes), k=1)
+    for i, probe in enumerate(probes):
+        assert matcher.predict(probe) == (labels[i, 0], pytest.approx(dists[i, 0]))
+
+
+def test_top_k_ordenado_y_sin_repetir():
+    matcher = LBPHMatcher.from_recognizer(_train())
+    probes, _ = _faces(seed=3)
+    labels, dists = matcher.predict_batch(np.stack(probes), k=3)
+    assert labels.shape == dists.shape == (len(probes), 3)
+    assert np.all(np.diff(dists, axis=1) >= 0)
+    assert all(len(set(fila)) == 3 for fila in labels)
+
+
+def test_shortlist_con_todas_las_personas_es_exhaustivo():
+    recognizer = _train()
+    exhaustivo = LBPHMatcher.from_recognizer(recognizer)
+    preseleccion = LBPHMatcher.from_recognizer(recognizer, shortlist=PEOPLE)
+    probes = np.stack(_faces(seed=4)[0])
+    for a, b in zip(exhaustivo.predict_batch(probes, k=2), preseleccion.predict_batch(probes, k=2)):
+        np.testing.assert_allclose(a, b)
+
+
+def test_save_load_conserva_el_modelo(tmp_path):
+    matcher = LBPHMatcher.from_recognizer(_train(radius=2, neighbors=8))
+    path = tmp_path / "model_lbph.bin"
+    matcher.save(str(path))
+    loaded = LBPHMatcher.load(str(path))
+
+    assert (loaded.radius, loaded.neighbors, loaded.grid_x, loaded.grid_y) == \
+        (matcher.radius, matcher.neighbors, matcher.grid_x, matcher.grid_y)
+    np.testing.assert_array_equal(loaded.labels, matcher.labels)
+    np.testing.assert_array_equal(loaded.histograms_t, matcher.histograms_t)
+    np.testing.assert_array_equal(loaded.prototypes_t, matcher.prototypes_t)
+
+    probes = np.stack(_faces(seed=5)[0])
+    for a, b in zip(matcher.predict_batch(probes, k=2), loaded.predict_batch(probes, k=2)):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_load_rechaza_otro_archivo(tmp_path):
+    path = tmp_path / "model_lbph.yml"
+    path.write_bytes(b"%YAML:1.0\n" + b" " * 64)
+    with pytest.raises(ValueError):
+        LBPHMatcher.load(str(path))